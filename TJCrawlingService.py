@@ -1,14 +1,30 @@
 import os
 import pymysql
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+from urllib.parse import urlparse
 from dotenv import load_dotenv
 import random
 import re
 import time
-from fuzzywuzzy import fuzz  # 유사도 측정
 import logging
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rate_limiter import AdaptiveRateLimiter, HostRateLimiter
+from http_client import HttpClient
+from response_cache import ResponseCache
+from db_writer import BulkUpdater
+from db_pool import ConnectionPool
+from output_sink import create_sink
+from work_queue import WorkQueue
+from sweep_log import SweepLog
+from month_snapshot import MonthSnapshot
+import song_matcher  # 유사도 측정
+import chosung
+from melon_index import MelonIndex
+from album_cache import AlbumCache
+from pipeline import Stage, StreamingPipeline
+from html_parser import create_parser
+from metrics import Metrics, timed
 
 # .env 파일 로드
 load_dotenv()
@@ -17,6 +33,71 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 작업 큐 단계 (TJ 목록 → MR/Live → 멜론 곡 ID → 멜론 상세)
+STAGE_MR_LIVE = 'mr_live'
+STAGE_MELON_ID = 'melon_id'
+STAGE_MELON_DETAIL = 'melon_detail'
+
+# 스트리밍 파이프라인이 동시에 붙잡는 MySQL 연결 수 (멜론 곡 ID / 상세 StreamingWriter 2개 + save_to_db 1개)
+STREAMING_DB_CONNECTIONS = 3
+
+
+def current_year_month():
+    return datetime.now().strftime("%Y%m")  # ex: 202504 (2025년 4월)
+
+
+def parse_year_month(year_month):
+    """'YYYYMM' 문자열을 (연, 월)로 변환. 형식이 다르거나 없는 월이면 ValueError."""
+    year_month = str(year_month)
+    try:
+        if not re.fullmatch(r'\d{6}', year_month):
+            raise ValueError
+        parsed = datetime.strptime(year_month, "%Y%m")
+    except ValueError:
+        raise ValueError(f"YYYYMM 형식의 월이 아닙니다: {year_month!r}") from None
+    return parsed.year, parsed.month
+
+
+def month_range(start_ym, end_ym):
+    """'YYYYMM' 형식의 시작 월부터 끝 월까지(포함) 모든 월을 반환. 시작 월이 끝 월보다 뒤면 ValueError."""
+    year, month = parse_year_month(start_ym)
+    end_year, end_month = parse_year_month(end_ym)
+    if (year, month) > (end_year, end_month):
+        raise ValueError(f"시작 월({start_ym})이 끝 월({end_ym})보다 뒤입니다.")
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append(f"{year:04d}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class StreamingWriter:
+    """스트리밍 파이프라인의 DB 쓰기 단계. 출력(sink)에서 빌린 BulkUpdater 를 가지며,
+    업데이트가 commit 된 뒤에 해당 곡의 작업 큐 항목을 완료(다음 단계 등록)로 표시한다."""
+
+    def __init__(self, service, stage, next_stage=None):
+        self.work_queue = service.work_queue
+        self.stage = stage
+        self.next_stage = next_stage
+        self.pending = {}
+        self.resources = ExitStack()
+        self.updater = self.resources.enter_context(service.sink.updates(on_flush=self.flushed))
+
+    def track(self, song_number, payload=None):
+        """다음 flush 때 완료 처리할 곡을 등록. updater 에 업데이트를 추가하기 전에 호출해야 한다."""
+        self.pending[str(song_number)] = payload
+
+    def flushed(self, keys):
+        for key in keys:
+            payload = self.pending.pop(str(key), None)
+            self.work_queue.complete(self.stage, key, self.next_stage, payload)
+
+    def close(self):
+        try:
+            self.updater.flush()
+        finally:
+            self.resources.close()
+
 class TJCrawlingService:
     def __init__(self):
         self.db_host = os.getenv('DB_HOST')
@@ -25,17 +106,159 @@ class TJCrawlingService:
         self.db_database = os.getenv('DB_DATABASE')
         self.db_port = 3306
 
-    def setup_db_config(self):
-        try:
-            db = pymysql.connect(
-                host=self.db_host,
-                user=self.db_user,
-                password=self.db_password,
-                database=self.db_database,
-                port=self.db_port,
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor
+        # 단계별 지연/요청/DB/대기 시간 메트릭 (실행이 끝나면 run_crawling.py 가 파일로 기록)
+        self.metrics = Metrics()
+
+        # 크롤링 대상 주소 (벤치마크에서는 로컬 모의 서버로 바꿔서 사용)
+        self.tj_base_url = os.getenv('TJ_BASE_URL', 'https://www.tjmedia.com')
+        self.melon_base_url = os.getenv('MELON_BASE_URL', 'https://www.melon.com')
+
+        # 멜론 보강 단계 실행 방식: sequential(기존 순차 + 고정 지연) / concurrent(동시 요청 + 호스트별 속도 제한)
+        self.crawl_mode = os.getenv('CRAWL_MODE', 'sequential')
+        self.max_in_flight = int(os.getenv('MAX_IN_FLIGHT', '4'))
+        rates = {
+            urlparse(self.melon_base_url).netloc: float(os.getenv('MELON_RATE', '0.5')),
+            urlparse(self.tj_base_url).netloc: float(os.getenv('TJ_RATE', '2')),
+        }
+        # fixed: 고정 속도 + sequential 모드의 고정 지연 / adaptive: 서버 응답에 따라 호스트별 속도를 조절 (고정 지연 없음)
+        self.throttle = os.getenv('THROTTLE', 'fixed')
+        # 샤드 실행 시 워커 프로세스들이 호스트별 토큰 버킷을 공유하는 디렉터리
+        shared_dir = os.getenv('RATE_LIMIT_SHARED_DIR') or None
+        if self.throttle == 'adaptive':
+            self.rate_limiter = AdaptiveRateLimiter(
+                rates=rates,
+                default_rate=1.0,
+                burst=int(os.getenv('RATE_BURST', '1')),
+                min_rate=float(os.getenv('THROTTLE_MIN_RATE', '0.05')),
+                max_rate=float(os.getenv('THROTTLE_MAX_RATE', '5')),
+                increase=float(os.getenv('THROTTLE_INCREASE', '0.05')),
+                decrease=float(os.getenv('THROTTLE_DECREASE', '0.5')),
+                slow_seconds=float(os.getenv('THROTTLE_SLOW_SECONDS', '3')),
+                state_path=os.getenv('THROTTLE_STATE_PATH', 'state/throttle.json'),
+                metrics=self.metrics,
+                shared_dir=shared_dir,
+            )
+        else:
+            self.rate_limiter = HostRateLimiter(
+                rates=rates,
+                default_rate=1.0,
+                burst=int(os.getenv('RATE_BURST', '1')),
+                shared_dir=shared_dir,
+            )
+
+        # 초성 컬럼의 비한글 처리 방식 (none: 버림 / all: 그대로 / alnum: 글자만 유지)
+        self.chosung_keep = os.getenv('CHOSUNG_KEEP', 'none')
+        self.chosung_page_size = int(os.getenv('CHOSUNG_PAGE_SIZE', '2000'))
+
+        # TJ / 멜론 페이지 파서 (lxml 이 있으면 lxml, 없으면 BeautifulSoup)
+        self.parser = create_parser(os.getenv('HTML_PARSER'))
+
+        # 재실행 시 이미 받은 페이지를 다시 받지 않도록 하는 응답 캐시 (출처별 TTL, 초)
+        self.cache_ttls = {
+            'tj_search': float(os.getenv('TJ_SEARCH_CACHE_TTL', str(24 * 3600))),
+            'melon_search': float(os.getenv('MELON_SEARCH_CACHE_TTL', str(7 * 24 * 3600))),
+            'melon_detail': float(os.getenv('MELON_DETAIL_CACHE_TTL', str(30 * 24 * 3600))),
+        }
+        cache = None
+        if os.getenv('HTTP_CACHE', '1') == '1':
+            cache = ResponseCache(
+                os.getenv('HTTP_CACHE_PATH', '.cache/http_cache.sqlite'),
+                max_bytes=int(os.getenv('HTTP_CACHE_MAX_MB', '512')) * 1024 * 1024,
+            )
+
+        # tjmedia.com / melon.com 요청이 공유하는 호스트별 keep-alive 세션
+        self.http = HttpClient(
+            pool_connections=int(os.getenv('HTTP_POOL_CONNECTIONS', '4')),
+            pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', str(max(8, self.max_in_flight)))),
+            retries=int(os.getenv('HTTP_RETRIES', '3')),
+            backoff_factor=float(os.getenv('HTTP_BACKOFF', '1.0')),
+            connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+            read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', '30')),
+            rate_limiter=self.rate_limiter,
+            cache=cache,
+            metrics=self.metrics,
+        )
+
+        # 멜론 보강 결과를 모아서 반영하는 단위 (곡 수 / 초)
+        self.db_flush_size = int(os.getenv('DB_FLUSH_SIZE', '100'))
+        self.db_flush_interval = float(os.getenv('DB_FLUSH_INTERVAL', '30'))
+
+        # 단계마다 다시 연결하지 않고 재사용하는 MySQL 연결 풀.
+        # 꺼낼 때 ping 으로 확인해 wait_timeout 등으로 끊긴 연결은 다시 연결한다.
+        # (벤치마크가 setup_db_config 를 바꿔 끼울 수 있도록 호출 시점에 찾는다)
+        # 스트리밍 파이프라인이 MySQL 에 쓸 때는 연결을 STREAMING_DB_CONNECTIONS 개까지 동시에 쓰므로 그보다 작은 풀은 거부한다.
+        streaming_mysql = (os.getenv('PIPELINE_MODE', 'staged') == 'streaming'
+                           and os.getenv('OUTPUT_SINK', 'mysql') == 'mysql')
+        self.db_pool = ConnectionPool(
+            lambda: self.setup_db_config(),
+            size=int(os.getenv('DB_POOL_SIZE', '4')),
+            acquire_timeout=float(os.getenv('DB_POOL_TIMEOUT', '60')),
+            metrics=self.metrics,
+            min_size=STREAMING_DB_CONNECTIONS if streaming_mysql else 1,
+        )
+
+        # 크롤링 결과를 쓰는 곳. mysql: song_info 에 바로 반영 / jsonl, csv, parquet: OUTPUT_DIR 에 파일로 내보냄
+        # (파일 출력은 최근 OUTPUT_STATE_DAYS 일 동안 내보낸 파일만 읽어 이미 내보낸 곡을 판단, 0 이면 전부)
+        self.sink = create_sink(
+            os.getenv('OUTPUT_SINK', 'mysql'), self, os.getenv('OUTPUT_DIR', 'export'),
+            state_days=float(os.getenv('OUTPUT_STATE_DAYS', '30')) or None,
+        )
+
+        # 이전에 본 멜론 검색 결과로 네트워크 없이 곡 ID 를 찾는 로컬 색인
+        self.melon_index = None
+        if os.getenv('MELON_INDEX', '1') == '1':
+            self.melon_index = MelonIndex(
+                os.getenv('MELON_INDEX_PATH', 'state/melon_index.sqlite'),
+                chosung=chosung.get_chosung,  # 색인은 CHOSUNG_KEEP 과 관계없이 항상 같은 규칙으로 만든다
+                min_similarity=float(os.getenv('MELON_INDEX_MIN_SIMILARITY', '0.8')),
+            )
+
+        # 멜론 앨범별 장르/발매 연도/앨범 이미지. 같은 앨범의 곡은 상세 페이지를 한 번만 받는다
+        self.album_cache = None
+        if os.getenv('ALBUM_CACHE', '1') == '1':
+            self.album_cache = AlbumCache(
+                os.getenv('ALBUM_CACHE_PATH', 'state/album_cache.sqlite'),
+                ttl=self.cache_ttls['melon_detail'],
             )
+
+        # staged: 단계별로 전체 곡을 처리 / streaming: 곡마다 준비되는 즉시 다음 단계로 넘김
+        self.pipeline_mode = os.getenv('PIPELINE_MODE', 'staged')
+        self.pipeline_queue_size = int(os.getenv('PIPELINE_QUEUE_SIZE', '50'))
+
+        # 단계별 곡 작업 상태를 저장해 중간에 중단돼도 이어서 진행
+        self.work_queue = WorkQueue(
+            os.getenv('WORK_QUEUE_PATH', 'state/work_queue.sqlite'),
+            max_attempts=int(os.getenv('WORK_MAX_ATTEMPTS', '5')),
+            base_backoff=float(os.getenv('WORK_RETRY_BACKOFF', '300')),
+        )
+
+        # 월별 신곡 목록의 해시를 저장해 지난 실행과 같은 목록은 DB 조회 없이 건너뛰고 달라진 곡만 처리
+        self.month_snapshot = None
+        if os.getenv('MONTH_SNAPSHOT', '1') == '1':
+            self.month_snapshot = MonthSnapshot(os.getenv('MONTH_SNAPSHOT_PATH', 'state/month_lists.sqlite'))
+
+        # 보강이 끝나지 않은 기존 곡을 다시 시도하는 sweep 설정 (keyset 페이지 크기 / 한 번에 처리할 곡 수)
+        self.sweep_page_size = int(os.getenv('SWEEP_PAGE_SIZE', '500'))
+        self.sweep_batch_size = int(os.getenv('SWEEP_BATCH_SIZE', '20'))
+        # 곡별 재시도 기록은 --sweep 을 실행할 때만 연다 (open_sweep_log)
+        self.sweep_state_path = os.getenv('SWEEP_STATE_PATH', 'state/sweep.sqlite')
+        self.sweep_max_attempts = int(os.getenv('SWEEP_MAX_ATTEMPTS', '10'))
+        self.sweep_retry_backoff = float(os.getenv('SWEEP_RETRY_BACKOFF', str(24 * 3600)))
+        self.sweep_log = None
+
+    def setup_db_config(self, local_infile=False):
+        try:
+            with self.metrics.timer('db_connect_duration_seconds'):
+                db = pymysql.connect(
+                    host=self.db_host,
+                    user=self.db_user,
+                    password=self.db_password,
+                    database=self.db_database,
+                    port=self.db_port,
+                    charset='utf8mb4',
+                    cursorclass=pymysql.cursors.DictCursor,
+                    local_infile=local_infile,
+                )
         except pymysql.MySQLError as e:
             logger.error(f"MySQL 연결 실패: {e}")
             raise
@@ -44,95 +267,147 @@ class TJCrawlingService:
         return db
 
     def get_chosung(self, text):
-        CHOSUNG_LIST = ['ㄱ','ㄲ','ㄴ','ㄷ','ㄸ','ㄹ','ㅁ','ㅂ','ㅃ',
-                        'ㅅ','ㅆ','ㅇ','ㅈ','ㅉ','ㅊ','ㅋ','ㅌ','ㅍ','ㅎ']
-        result = []
-
-        for char in text:
-            if '가' <= char <= '힣':
-                code = ord(char) - ord('가')
-                chosung_index = code // 588
-                result.append(CHOSUNG_LIST[chosung_index])
-            else:
-                result.append('')  # 비한글은 초성 생략 (또는 ' '도 가능)
-
-        return ''.join(result)
-     
+        """초성 추출. 비한글 처리 방식은 CHOSUNG_KEEP (기본값 none: 비한글은 초성 생략)."""
+        return chosung.get_chosung(text, self.chosung_keep)
+
+    def recompute_chosung(self):
+        """song_info 전체의 song_name_chosung / artist_name_chosung 을 현재 규칙(CHOSUNG_KEEP)으로 다시 계산.
+        song_number 순서로 keyset 페이지 단위로 읽고, 값이 달라진 행만 BulkUpdater 로 모아서 반영한다.
+        읽기와 업데이트에 같은 연결을 쓰므로 풀 크기가 1 이어도 동작한다."""
+        with self.db_pool.connection() as connection, self.sink.updates(connection=connection) as updater:
+            scanned = changed = 0
+            last_song_number = None
+            while True:
+                query = "SELECT song_number, song_name, artist_name, song_name_chosung, artist_name_chosung FROM song_info"
+                params = []
+                if last_song_number is not None:
+                    query += " WHERE song_number > %s"
+                    params.append(last_song_number)
+                query += " ORDER BY song_number LIMIT %s"
+                params.append(self.chosung_page_size)
+
+                with connection.cursor() as cursor:
+                    with self.db_timer('select_chosung'):
+                        cursor.execute(query, params)
+                    rows = cursor.fetchall()
+                if not rows:
+                    break
+                last_song_number = rows[-1]['song_number']
+
+                song_name_chosungs = chosung.chosung_many([row['song_name'] or '' for row in rows], self.chosung_keep)
+                artist_name_chosungs = chosung.chosung_many([row['artist_name'] or '' for row in rows], self.chosung_keep)
+                for row, song_name_chosung, artist_name_chosung in zip(rows, song_name_chosungs, artist_name_chosungs):
+                    if (row['song_name_chosung'] != song_name_chosung
+                            or row['artist_name_chosung'] != artist_name_chosung):
+                        updater.add(row['song_number'], {
+                            'song_name_chosung': song_name_chosung,
+                            'artist_name_chosung': artist_name_chosung,
+                        })
+                        changed += 1
+                scanned += len(rows)
+                logger.info(f"초성 재계산: {scanned}개 확인, {changed}개 변경")
+            updater.flush()
+        logger.info(f"초성 재계산 완료: {scanned}개 중 {changed}개 곡의 초성을 업데이트했습니다.")
+        return changed
+
+    def close(self):
+        """HTTP 세션, 출력 파일, DB 연결을 닫고 학습한 요청 속도를 저장."""
+        self.http.close()
+        self.sink.close()
+        self.db_pool.close()
+        if isinstance(self.rate_limiter, AdaptiveRateLimiter):
+            self.rate_limiter.save()
+
+    def db_timer(self, statement):
+        return self.metrics.timer('db_statement_duration_seconds', statement=statement)
+
+    def pause(self, seconds, reason):
+        """고정 지연. 대기한 시간을 sleep_seconds_total{reason} 에 기록.
+        adaptive 모드에서는 속도 제한기가 요청 간격을 조절하므로 대기하지 않는다."""
+        if self.throttle == 'adaptive':
+            return
+        self.metrics.inc('sleep_seconds_total', seconds, reason=reason)
+        time.sleep(seconds)
+
+    @timed('save_to_db')
     def save_to_db(self, songs):
         try:
-            connection = self.setup_db_config()
-            cursor = connection.cursor()
+            rows = []
 
-            # song_info 테이블에 데이터 삽입
-            insert_query = """
-                INSERT IGNORE INTO song_info 
-                (song_number, song_name, artist_name, is_mr, is_live, song_name_chosung, artist_name_chosung)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-            """
-            inserted_rows = 0
+            # 초성 추출 (곡 목록 전체를 한 번에 변환)
+            song_name_chosungs = chosung.chosung_many([song[1] for song in songs], self.chosung_keep)
+            artist_name_chosungs = chosung.chosung_many([song[2] for song in songs], self.chosung_keep)
 
-            for song in songs:
+            for song, song_name_chosung, artist_name_chosung in zip(songs, song_name_chosungs, artist_name_chosungs):
                 song_number, song_name, artist_name, is_mr, is_live = song
 
-                # 초성 추출
-                song_name_chosung = self.get_chosung(song_name)
-                artist_name_chosung = self.get_chosung(artist_name)
-
-                cursor.execute(insert_query, (
+                rows.append((
                     song_number, song_name, artist_name,
                     is_mr, is_live, song_name_chosung, artist_name_chosung
                 ))
-                if cursor.rowcount > 0:
-                    inserted_rows += cursor.rowcount
 
-            connection.commit()
-            cursor.close()
-            connection.close()
+            # song_info 테이블(또는 내보내기 파일)에 데이터 삽입
+            inserted_rows = self.sink.insert_songs(rows)
 
+            self.metrics.inc('songs_total', inserted_rows, stage='saved')
             logger.info(f"{inserted_rows}개의 신곡 정보가 성공적으로 데이터베이스에 저장 되었습니다.")
         except Exception as e:
             logger.error(f"데이터베이스에 저장 중 오류 발생: {e}")
             raise
     
-    def read_from_db(self):
+    def read_from_db(self, song_numbers, chunk_size=500):
+        """주어진 song_number 중 DB 에 이미 있는 행만 조회. 전체 테이블 대신 IN (...) 을 chunk 단위로 조회한다."""
         try:
-            connection = self.setup_db_config()
-            cursor = connection.cursor()
-
-            # 읽기
-            query = """
-                SELECT song_number FROM song_info
-            """
-            
-            cursor.execute(query)  # 쿼리 실행
-            result = cursor.fetchall()  # 결과 가져오기
-
-            cursor.close()
-            connection.close()
+            result = []
+            song_numbers = list(song_numbers)
+            with self.db_pool.connection() as connection, connection.cursor() as cursor:
+                for i in range(0, len(song_numbers), chunk_size):
+                    chunk = song_numbers[i:i + chunk_size]
+                    query = """
+                        SELECT song_number FROM song_info
+                        WHERE song_number IN ({})
+                    """.format(','.join(['%s'] * len(chunk)))
+
+                    with self.db_timer('select_existing'):
+                        cursor.execute(query, chunk)  # 쿼리 실행
+                    result.extend(cursor.fetchall())  # 결과 가져오기
 
             return result  # 결과 반환
         except Exception as e:
             logger.error(f"데이터베이스에서 읽기 중 오류 발생: {e}")
             raise
+
+    @timed('find_missing_songs')
+    def find_missing_songs(self, songs):
+        """songs 중 DB 에 없는 곡만 반환."""
+        if not songs:
+            return []
+        db_song_numbers_set = self.sink.existing_song_numbers({song[0] for song in songs})
+        missing_songs = [song for song in songs if str(song[0]) not in db_song_numbers_set]
+        self.metrics.inc('songs_total', len(missing_songs), stage='missing')
+        return missing_songs
      
-    def crawl_new_songs(self):
+    @timed('crawl_new_songs')
+    def crawl_new_songs(self, year_month=None):
+        """year_month 의 TJ 신곡 목록 (곡 번호, 제목, 아티스트). 조회에 실패하면(resultCode 가 99 가 아니면) None.
+        빈 목록은 신곡이 없는 달이라는 뜻이므로 실패와 구분한다."""
         try:
-            now = datetime.now()
-            year_month = now.strftime("%Y%m")  # ex: 202504 (2025년 4월)
+            if year_month is None:
+                year_month = current_year_month()
 
-            url = "https://www.tjmedia.com/legacy/api/newSongOfMonth"
+            url = f"{self.tj_base_url}/legacy/api/newSongOfMonth"
             payload = {
                 "searchYm": year_month
             }
 
-            response = requests.post(url, data=payload)
+            response = self.http.post(url, data=payload)
             response.raise_for_status()
 
             data = response.json()
 
             if data['resultCode'] != "99":
                 logger.info("데이터 조회 실패")
-                return []
+                return None
 
             songs = []
 
@@ -143,6 +418,7 @@ class TJCrawlingService:
 
                 songs.append((song_number, song_name, artist_name))
 
+            self.metrics.inc('songs_total', len(songs), stage='listed')
             logger.info(f"{year_month} 기준 {len(songs)}개 신곡 크롤링 완료")
             for song in songs:
                 print(song)
@@ -153,79 +429,449 @@ class TJCrawlingService:
             print(f"크롤링 중 오류 발생: {e}")
             raise
     
+    @timed('find_changed_songs')
+    def find_changed_songs(self, year_month, songs):
+        """월 목록 songs 중 처리할 곡(DB 에 없는 곡)을 반환.
+        지난 실행에서 기록한 목록과 같으면 DB 를 조회하지 않고 빈 목록을, 다르면 새로 나오거나 바뀐 곡만 DB 와 비교한다.
+        제목/아티스트가 바뀐 기존 곡은 이름과 초성 컬럼만 업데이트한다."""
+        if self.month_snapshot is None:
+            return self.find_missing_songs(songs)
+
+        changes = self.month_snapshot.diff(year_month, songs)
+        if changes is None:
+            self.metrics.inc('month_lists_total', result='unchanged')
+            logger.info(f"{year_month} 신곡 목록이 지난 실행과 같아 건너뜁니다.")
+            return []
+        added, modified = changes
+        self.metrics.inc('month_lists_total', result='changed')
+        logger.info(f"{year_month} 신곡 목록 변경: 새 곡 {len(added)}개, 정보가 바뀐 곡 {len(modified)}개")
+
+        missing_songs = self.find_missing_songs(added + modified)
+        missing_numbers = {str(song[0]) for song in missing_songs}
+        self.correct_song_names([song for song in modified if str(song[0]) not in missing_numbers])
+        return missing_songs
+
+    def record_month(self, year_month, songs):
+        """처리한 월 목록을 기록. 곡을 작업 큐에 등록한 뒤에 호출한다."""
+        if self.month_snapshot is not None:
+            self.month_snapshot.record(year_month, songs)
+
+    def correct_song_names(self, songs):
+        """TJ 목록에서 제목/아티스트가 바뀐 기존 곡의 이름과 초성 컬럼을 업데이트."""
+        if not songs:
+            return
+        song_name_chosungs = chosung.chosung_many([song[1] for song in songs], self.chosung_keep)
+        artist_name_chosungs = chosung.chosung_many([song[2] for song in songs], self.chosung_keep)
+        with self.sink.updates() as updater:
+            for song, song_name_chosung, artist_name_chosung in zip(songs, song_name_chosungs, artist_name_chosungs):
+                updater.add(song[0], {
+                    'song_name': song[1],
+                    'artist_name': song[2],
+                    'song_name_chosung': song_name_chosung,
+                    'artist_name_chosung': artist_name_chosung,
+                })
+            updater.flush()
+        self.metrics.inc('songs_total', len(songs), stage='corrected')
+        logger.info(f"제목/아티스트가 바뀐 {len(songs)}개 곡 정보를 업데이트했습니다: {[song[0] for song in songs]}")
+
     def crawl_and_save_new_songs(self):
         try:
-            new_songs = self.crawl_new_songs()
-            db_song_numbers = self.read_from_db()
-
-            # db에 없는 songs 들만 남긴다
-            db_song_numbers_set = {str(song['song_number']) for song in db_song_numbers}  # DB에서 조회한 song_number를 집합으로 변환
-            #print(db_song_numbers_set)
-            new_songs_filtered = [song for song in new_songs if song[0] not in db_song_numbers_set]
-            logger.info(f"DB에 없는 {len(new_songs_filtered)}개의 신곡을 발견했습니다.")
-            #print(f"DB에 없는 {len(new_songs_filtered)}개의 신곡을 발견했습니다.")
-            if len(new_songs_filtered) == 0:
-                return
+            year_month = current_year_month()
+            new_songs = self.crawl_new_songs(year_month)
+
+            # 목록 조회에 실패하면 지난 실행의 월 목록 기록을 그대로 두고 남은 작업만 처리
+            if new_songs is not None:
+                # 지난 실행 이후 새로 나오거나 바뀐 곡 중 db에 없는 songs 들만 남긴다
+                new_songs_filtered = self.find_changed_songs(year_month, new_songs)
+                logger.info(f"DB에 없는 {len(new_songs_filtered)}개의 신곡을 발견했습니다.")
+                #print(f"DB에 없는 {len(new_songs_filtered)}개의 신곡을 발견했습니다.")
+
+                # 신곡을 작업 큐에 등록하고, 이전 실행에서 남은 작업과 함께 처리
+                self.work_queue.enqueue(STAGE_MR_LIVE, [(song[0], list(song)) for song in new_songs_filtered])
+                self.record_month(year_month, new_songs)
+            self.process_work_queue()
+        except Exception as e:
+            logger.error(f"신곡 크롤링 및 저장 중 오류 발생: {e}")
+            raise
+
+    def collect_missing_songs(self, start_ym, end_ym):
+        """start_ym ~ end_ym 의 월별 신곡 목록을 동시에 가져와 중복을 제거하고,
+        월 목록이 도착하는 대로 DB 에 없는 곡 목록을 반환(yield).
+        지난 실행과 같은 월 목록은 건너뛰고, 월 목록은 호출한 쪽이 다음 값을 요청할 때(작업 큐에 등록한 뒤) 기록한다."""
+        months = month_range(start_ym, end_ym)
+        logger.info(f"{start_ym} ~ {end_ym} ({len(months)}개월) 신곡 목록을 수집합니다.")
+
+        seen = set()
+        missing = 0
+        for year_month, songs, error in self.run_concurrently(self.crawl_new_songs, months):
+            if error is not None or songs is None:
+                logger.error(f"{year_month} 신곡 목록 조회 실패: {error or '데이터 조회 실패'}")
+                continue
+
+            # 여러 달에 걸쳐 중복으로 나온 곡은 처음 나온 것만 사용
+            missing_songs = []
+            for song in self.find_changed_songs(year_month, songs):
+                if str(song[0]) not in seen:
+                    seen.add(str(song[0]))
+                    missing_songs.append(song)
+
+            missing += len(missing_songs)
+            yield missing_songs
+            self.record_month(year_month, songs)
+
+        logger.info(f"{len(months)}개월 목록에서 DB에 없는 곡 {missing}개를 찾았습니다.")
+
+    def backfill(self, start_ym, end_ym):
+        """기간 내 월별 신곡 중 DB 에 없는 곡을 작업 큐에 등록한 뒤 저장/보강 단계를 실행."""
+        try:
+            for missing_songs in self.collect_missing_songs(start_ym, end_ym):
+                self.work_queue.enqueue(STAGE_MR_LIVE, [(song[0], list(song)) for song in missing_songs])
+            self.process_work_queue()
+        except Exception as e:
+            logger.error(f"신곡 백필 중 오류 발생: {e}")
+            raise
+
+    def read_incomplete_songs(self, before=None, limit=500):
+        """melon_song_id 또는 장르/발매 연도/앨범이 비어 있는 곡을 song_number 내림차순(최신 곡부터)으로 limit 개 조회.
+        before 가 주어지면 그보다 작은 song_number 부터 조회한다 (keyset 페이지네이션)."""
+        query = """
+            SELECT song_number, song_name, artist_name, melon_song_id
+            FROM song_info
+            WHERE (melon_song_id IS NULL OR genre IS NULL OR year IS NULL OR album IS NULL)
+        """
+        params = []
+        if before is not None:
+            query += " AND song_number < %s"
+            params.append(before)
+        query += " ORDER BY song_number DESC LIMIT %s"
+        params.append(limit)
+
+        with self.db_pool.connection() as connection, connection.cursor() as cursor:
+            with self.db_timer('select_incomplete'):
+                cursor.execute(query, params)
+            return cursor.fetchall()
+
+    def open_sweep_log(self):
+        if self.sweep_log is None:
+            self.sweep_log = SweepLog(self.sweep_state_path, max_attempts=self.sweep_max_attempts,
+                                      base_backoff=self.sweep_retry_backoff)
+        return self.sweep_log
+
+    @timed('sweep_incomplete')
+    def sweep_incomplete(self, time_budget=None, request_budget=None):
+        """보강이 끝나지 않은 기존 곡을 최신 곡부터 keyset 페이지 단위로 읽어 멜론 곡 ID / 상세 단계를 다시 실행.
+
+        melon_song_id 가 있는 곡은 검색 없이 상세 단계만 실행한다. 페이지 안에서는 시도 횟수가 적은 곡부터 처리하고,
+        최근에 실패한 곡은 SweepLog 의 백오프가 지날 때까지 건너뛴다.
+        time_budget(초) 또는 request_budget(HTTP 요청 수)을 다 쓰면 다음 배치를 시작하지 않는다.
+        """
+        self.open_sweep_log()
+        started_at = time.monotonic()
+        start_requests = self.http.request_count
+
+        def budget_left():
+            if time_budget is not None and time.monotonic() - started_at >= time_budget:
+                return False
+            if request_budget is not None and self.http.request_count - start_requests >= request_budget:
+                return False
+            return True
+
+        matched = enriched = 0
+        before = None
+        while budget_left():
+            rows = self.read_incomplete_songs(before, self.sweep_page_size)
+            if not rows:
+                break
+            before = rows[-1]['song_number']
+            songs = {str(row['song_number']): (row['song_number'], row['song_name'], row['artist_name']) for row in rows}
+
+            missing_ids = self.sweep_log.due(STAGE_MELON_ID, [row['song_number'] for row in rows if not row['melon_song_id']])
+            missing_details = self.sweep_log.due(STAGE_MELON_DETAIL, [row['song_number'] for row in rows if row['melon_song_id']])
+
+            for i in range(0, len(missing_ids), self.sweep_batch_size):
+                if not budget_left():
+                    break
+                batch = [songs[song_number] for song_number in missing_ids[i:i + self.sweep_batch_size]]
+                outcomes = self.crawl_melon_song_id_and_album(batch)
+                found = []
+                for song in batch:
+                    best_song_id, error = outcomes.get(str(song[0]), (None, "처리되지 않음"))
+                    if best_song_id:
+                        found.append(str(song[0]))
+                    else:
+                        self.sweep_log.failed(STAGE_MELON_ID, song[0], error or "매칭 결과 없음")
+                self.sweep_log.succeeded(STAGE_MELON_ID, found)
+                self.metrics.inc('sweep_songs_total', len(found), stage=STAGE_MELON_ID, result='success')
+                self.metrics.inc('sweep_songs_total', len(batch) - len(found), stage=STAGE_MELON_ID, result='failure')
+                matched += len(found)
+                # 새로 찾은 곡은 바로 상세 단계 대상에 추가
+                missing_details.extend(found)
+
+            for i in range(0, len(missing_details), self.sweep_batch_size):
+                if not budget_left():
+                    break
+                batch = [songs[song_number] for song_number in missing_details[i:i + self.sweep_batch_size]]
+                outcomes = self.crawl_genre_date_album(batch)
+                done = []
+                for song in batch:
+                    detail, error = outcomes.get(str(song[0]), (None, "처리되지 않음"))
+                    if error is None and detail is not None and None not in detail:
+                        done.append(str(song[0]))
+                    else:
+                        # 일부 값이 비어 있으면 행이 계속 sweep 대상이므로 실패로 기록해 백오프
+                        self.sweep_log.failed(STAGE_MELON_DETAIL, song[0], error or f"상세 정보 부족: {detail}")
+                self.sweep_log.succeeded(STAGE_MELON_DETAIL, done)
+                self.metrics.inc('sweep_songs_total', len(done), stage=STAGE_MELON_DETAIL, result='success')
+                self.metrics.inc('sweep_songs_total', len(batch) - len(done), stage=STAGE_MELON_DETAIL, result='failure')
+                enriched += len(done)
+
+        logger.info(f"보강 sweep 완료: 곡 ID {matched}개, 상세 정보 {enriched}개 채움 "
+                    f"({time.monotonic() - started_at:.1f}초, HTTP 요청 {self.http.request_count - start_requests}회)")
+        return matched, enriched
+
+    def process_work_queue(self):
+        """PIPELINE_MODE 에 따라 작업 큐의 남은 작업을 스트리밍 또는 단계별로 처리."""
+        if self.pipeline_mode == 'streaming':
+            self.run_streaming_pipeline()
+        else:
+            self.run_work_queue()
+
+    def run_work_queue(self):
+        """작업 큐에 남아 있는 MR/Live → 멜론 곡 ID → 멜론 상세 작업을 순서대로 처리."""
+        self.run_mr_live_stage()
+        self.run_melon_id_stage()
+        self.run_melon_detail_stage()
+        logger.info(f"작업 큐 현황: {self.work_queue.counts()}")
+
+    def run_streaming_pipeline(self):
+        """MR/Live → 저장 → 멜론 곡 ID → 멜론 상세 단계를 크기가 제한된 큐로 연결해 곡 단위로 흘려보낸다.
+        작업 큐 상태는 DB 에 commit 된 뒤에 완료로 표시하고, 이전 실행에서 남은 작업은 마지막에 단계별로 처리한다."""
+        songs = self.claim_songs(STAGE_MR_LIVE)
+        if songs:
+            # MR/Live 는 같은 아티스트끼리 묶어서 조회
+            songs_by_artist = {}
+            for song in songs:
+                songs_by_artist.setdefault(song[2], []).append(song)
+
+            id_writer = StreamingWriter(self, STAGE_MELON_ID, STAGE_MELON_DETAIL)
+            detail_writer = StreamingWriter(self, STAGE_MELON_DETAIL)
+
+            def mr_live(group):
+                return [self.crawl_mr_and_live(group)]
+
+            def save(results):
+                self.save_to_db(results)
+                for song in results:
+                    self.work_queue.complete(STAGE_MR_LIVE, song[0], STAGE_MELON_ID, list(song[:3]))
+                return [song[:3] for song in results]
+
+            def melon_id(song):
+                best_match = self.find_melon_song_id(song, pace=False)
+                return [(song, best_match[3] if best_match else None)]
+
+            def write_melon_id(result):
+                song, best_song_id = result
+                if not best_song_id:
+                    # 매칭 결과가 없는 곡은 재시도하지 않고 완료 처리
+                    self.work_queue.complete(STAGE_MELON_ID, song[0])
+                    return []
+                id_writer.track(song[0], list(song))
+                self.update_melon_song_id(song, best_song_id, id_writer.updater)
+                return [{'song_number': song[0], 'song_name': song[1], 'artist_name': song[2], 'melon_song_id': best_song_id}]
+
+            def melon_detail(song):
+                return [(song, self.fetch_album_detail(song))]
+
+            def write_melon_detail(result):
+                song, detail = result
+                if detail is None:
+                    self.work_queue.fail(STAGE_MELON_DETAIL, song['song_number'], "상세 정보를 가져오지 못함",
+                                         payload=[song['song_number'], song['song_name'], song['artist_name']])
+                    return []
+                detail_writer.track(song['song_number'])
+                self.update_genre_date_album(song, detail, detail_writer.updater)
+                return []
+
+            def on_error(stage_name, item, error):
+                logger.error(f"스트리밍 {stage_name} 단계 처리 중 오류 발생: {error}")
+                if stage_name in ('mr_live', 'save'):
+                    self.fail_songs(STAGE_MR_LIVE, item, error)
+                elif stage_name in ('melon_id', 'write_melon_id'):
+                    song = item[0] if stage_name == 'write_melon_id' else item
+                    self.work_queue.fail(STAGE_MELON_ID, song[0], error, payload=list(song))
+                else:
+                    song = item[0] if stage_name == 'write_melon_detail' else item
+                    self.work_queue.fail(STAGE_MELON_DETAIL, song['song_number'], error,
+                                         payload=[song['song_number'], song['song_name'], song['artist_name']])
+
+            pipeline = StreamingPipeline([
+                Stage('mr_live', mr_live),
+                Stage('save', save),
+                Stage('melon_id', melon_id, workers=self.max_in_flight),
+                Stage('write_melon_id', write_melon_id, on_finish=id_writer.close),
+                Stage('melon_detail', melon_detail, workers=self.max_in_flight),
+                Stage('write_melon_detail', write_melon_detail, on_finish=detail_writer.close),
+            ], queue_size=self.pipeline_queue_size, on_error=on_error)
+            pipeline.run(songs_by_artist.values())
+
+        # 이전 실행에서 남은 작업
+        self.run_melon_id_stage()
+        self.run_melon_detail_stage()
+        logger.info(f"작업 큐 현황: {self.work_queue.counts()}")
+
+    def claim_songs(self, stage):
+        return [tuple(payload) for _, payload in self.work_queue.claim(stage)]
+
+    def fail_songs(self, stage, songs, error):
+        for song in songs:
+            self.work_queue.fail(stage, song[0], error)
+
+    def run_mr_live_stage(self):
+        songs = self.claim_songs(STAGE_MR_LIVE)
+        if not songs:
+            return
+        try:
             # MR 및 Live 정보 크롤링
-            songs_include_mr_and_live = self.crawl_mr_and_live(new_songs_filtered)
+            songs_include_mr_and_live = self.crawl_mr_and_live(songs)
             # 크롤링 결과가 있는 경우에만 저장 진행
-            if songs_include_mr_and_live and len(songs_include_mr_and_live) > 0:
+            if songs_include_mr_and_live:
                 self.save_to_db(songs_include_mr_and_live)
-                # 성공적으로 저장된 곡들에 대해서만 추가 정보 크롤링 진행
-                songs_to_process = [song for song in new_songs_filtered if any(s[0] == song[0] for s in songs_include_mr_and_live)]
-                if songs_to_process:
-                    self.crawl_melon_song_id_and_album(songs_to_process)
-                    self.crawl_genre_date_album(songs_to_process)
             else:
                 logger.info("크롤링된 MR 및 Live 정보가 없어 저장을 진행하지 않습니다.")
         except Exception as e:
-            logger.error(f"신곡 크롤링 및 저장 중 오류 발생: {e}")
+            self.fail_songs(STAGE_MR_LIVE, songs, e)
+            raise
+
+        # 성공적으로 저장된 곡들에 대해서만 추가 정보 크롤링 진행
+        saved_numbers = {str(s[0]) for s in songs_include_mr_and_live}
+        for song in songs:
+            if str(song[0]) in saved_numbers:
+                self.work_queue.complete(STAGE_MR_LIVE, song[0], STAGE_MELON_ID, list(song))
+            else:
+                self.work_queue.fail(STAGE_MR_LIVE, song[0], "MR 및 Live 정보 없음")
+
+    def run_melon_id_stage(self):
+        songs = self.claim_songs(STAGE_MELON_ID)
+        if not songs:
+            return
+        try:
+            outcomes = self.crawl_melon_song_id_and_album(songs)
+        except Exception as e:
+            self.fail_songs(STAGE_MELON_ID, songs, e)
+            raise
+
+        for song in songs:
+            best_song_id, error = outcomes.get(str(song[0]), (None, "처리되지 않음"))
+            if error is not None:
+                self.work_queue.fail(STAGE_MELON_ID, song[0], error)
+            elif best_song_id:
+                self.work_queue.complete(STAGE_MELON_ID, song[0], STAGE_MELON_DETAIL, list(song))
+            else:
+                # 매칭 결과가 없는 곡은 재시도하지 않고 완료 처리
+                self.work_queue.complete(STAGE_MELON_ID, song[0])
+
+    def run_melon_detail_stage(self):
+        songs = self.claim_songs(STAGE_MELON_DETAIL)
+        if not songs:
+            return
+        try:
+            outcomes = self.crawl_genre_date_album(songs)
+        except Exception as e:
+            self.fail_songs(STAGE_MELON_DETAIL, songs, e)
             raise
 
+        for song in songs:
+            if str(song[0]) not in outcomes:
+                # melon_song_id 가 없어 조회 대상이 아닌 곡
+                self.work_queue.complete(STAGE_MELON_DETAIL, song[0])
+                continue
+            detail, error = outcomes[str(song[0])]
+            if error is not None:
+                self.work_queue.fail(STAGE_MELON_DETAIL, song[0], error)
+            elif detail is None:
+                self.work_queue.fail(STAGE_MELON_DETAIL, song[0], "상세 정보를 가져오지 못함")
+            else:
+                self.work_queue.complete(STAGE_MELON_DETAIL, song[0])
+
+    @timed('crawl_mr_and_live')
     def crawl_mr_and_live(self, songs):
         try:
+            # 같은 아티스트의 곡이 2개 이상이면 아티스트 검색 결과 페이지 한 번으로 MR/Live 정보를 함께 채운다
+            songs_by_artist = {}
+            for song in songs:
+                songs_by_artist.setdefault(song[2], []).append(song)
+
+            flags = {}
+            for artist, artist_songs in songs_by_artist.items():
+                if len(artist_songs) < 2:
+                    continue
+                try:
+                    flags.update(self.crawl_mr_and_live_by_artist(artist))
+                except Exception as e:
+                    logger.error(f"아티스트 {artist}의 MR 및 Live 정보 일괄 크롤링 중 오류 발생: {e}")
+
             return_songs = []
+            batched = 0
             for song in songs:
-                result = self.crawl_one_mr_and_live(song)
+                if str(song[0]) in flags:
+                    is_mr, is_live = flags[str(song[0])]
+                    result = (song[0], song[1], song[2], is_mr, is_live)
+                    batched += 1
+                else:
+                    # 일괄 조회에서 찾지 못한 곡은 곡 번호로 개별 조회
+                    result = self.crawl_one_mr_and_live(song)
                 if result:  # None이 아닌 경우에만 추가
                     return_songs.append(result)
-            logger.info(f"{len(return_songs)}개의 MR 및 Live 정보가 성공적으로 크롤링되었습니다.")
+            logger.info(f"{len(return_songs)}개의 MR 및 Live 정보가 성공적으로 크롤링되었습니다. (일괄 조회 {batched}건)")
             return return_songs
         except Exception as e:
             logger.error(f"MR 및 Live 정보 크롤링 중 오류 발생: {e}")
             raise
-    
-    def crawl_genre_date_album(self, songs):
+
+    def parse_mr_and_live_rows(self, html):
+        """TJ 검색 결과 페이지의 모든 행에서 {곡 번호: (MR 여부, Live 여부)}를 추출."""
+        with self.metrics.timer('parse_duration_seconds', page='tj_search'):
+            return self.parser.parse_tj_rows(html)
+
+    @timed('crawl_mr_and_live_by_artist')
+    def crawl_mr_and_live_by_artist(self, artist):
+        """아티스트 이름으로 TJ 를 검색하고 결과 페이지에 있는 모든 곡의 MR/Live 정보를 반환."""
+        url = f'{self.tj_base_url}/tjsong/song_search_list.asp'
+        params = {
+            'strType': '2',
+            'natType': '',
+            'strText': artist,
+            'strCond': '0',
+            'strSize02': '100',
+        }
+        response = self.http.get(url, params=params, cache_ttl=self.cache_ttls['tj_search'])
+        html = response.content.decode('utf-8', 'replace')
+        flags = self.parse_mr_and_live_rows(html)
+        logger.info(f"아티스트 {artist} 검색 결과에서 {len(flags)}개 곡의 MR 및 Live 정보를 확인했습니다.")
+        return flags
+
+    @timed('crawl_genre_date_album')
+    def crawl_genre_date_album(self, songs, mode=None):
         try:
             batch_size = 20
-            connection = self.setup_db_config()
-            cursor = connection.cursor()
-
-            # song_number 값만 추출하여 SQL IN 조건에 사용할 리스트 생성
-            song_numbers = [song[0] for song in songs]  # songs 리스트에 song_number만 추출
 
-            # IN 조건에 사용할 song_number 리스트를 쿼리에 추가
-            query = """
-                SELECT song_number, song_name, artist_name, melon_song_id 
-                FROM song_info 
-                WHERE melon_song_id IS NOT NULL 
-                AND song_number IN ({})
-            """.format(','.join(['%s'] * len(song_numbers)))
+            # melon_song_id 가 저장된 곡만 가져옴
+            results = self.sink.melon_songs(songs)
 
-            # 쿼리를 실행하여 해당 조건에 맞는 데이터를 가져옴
-            cursor.execute(query, song_numbers)
-            results = cursor.fetchall()
-
-            for i in range(0, len(results), batch_size):
-                batch = results[i:i + batch_size]
-                self.process_batch_genre_date_album(batch, cursor, connection)
+            with self.sink.updates() as updater:
+                outcomes = {}
+                if (mode or self.crawl_mode) == 'concurrent':
+                    outcomes.update(self.process_genre_date_album_concurrently(results, updater))
+                else:
+                    for i in range(0, len(results), batch_size):
+                        batch = results[i:i + batch_size]
+                        outcomes.update(self.process_batch_genre_date_album(batch, updater))
+                updater.flush()
+            return outcomes
 
         except Exception as e:
             logger.error(f"장르, 발매일, 앨범 정보 크롤링 중 오류 발생: {e}")
             raise
-        finally:
-            cursor.close()
-            connection.close()
 
     def extract_year(self, date_str):
         try:
@@ -241,104 +887,181 @@ class TJCrawlingService:
             logger.error(f"Error extracting year from date string {date_str}: {e}")
             return None
 
-    def process_batch_genre_date_album(self, batch, cursor, connection):
-        """20개 단위로 멜론 데이터를 BeautifulSoup을 사용해 처리하고 업데이트합니다."""
+    @timed('fetch_melon_song_detail')
+    def fetch_melon_song_detail(self, song, pace=False):
+        """멜론 곡 상세 페이지에서 (장르, 발매 연도, 앨범 이미지 URL)을 추출. 실패 시 None 반환."""
         headers = {
             "User-Agent": random.choice([
                 "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36",
                 "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0"
             ])
         }
+        melon_song_id = song['melon_song_id']
+        song_name = song['song_name']
+        artist_name = song['artist_name']
+
+        # 멜론 곡 상세 페이지로 요청
+        url = f"{self.melon_base_url}/song/detail.htm?songId={melon_song_id}"
+        response = self.http.get(url, headers=headers, cache_ttl=self.cache_ttls['melon_detail'])
+        if pace and not getattr(response, 'from_cache', False):
+            self.pause(random.randrange(12, 20), 'melon_detail')  # 12-20초 랜덤 지연 (캐시 적중 시 생략)
+
+        if response.status_code != 200:
+            logger.error(f"Failed to fetch page for song {song_name} by {artist_name}: Status code {response.status_code}")
+            return None
 
-        for song in batch:
-            try:
-                song_number = song['song_number']
-                melon_song_id = song['melon_song_id']
-                song_name = song['song_name']
-                artist_name = song['artist_name']
-
-                # 멜론 곡 상세 페이지로 요청
-                url = f"https://www.melon.com/song/detail.htm?songId={melon_song_id}"
-                response = requests.get(url, headers=headers)
-
-                if response.status_code != 200:
-                    logger.error(f"Failed to fetch page for song {song_name} by {artist_name}: Status code {response.status_code}")
-                    continue
-
-                # BeautifulSoup으로 HTML 파싱
-                soup = BeautifulSoup(response.text, 'html.parser')
+        # 장르, 발매일, 앨범 이미지 URL 추출
+        try:
+            with self.metrics.timer('parse_duration_seconds', page='melon_detail'):
+                genre, release_date, album_image_url, album_id = self.parser.parse_melon_detail(
+                    response.text, with_album=True)
+        except Exception as e:
+            logger.error(f"Error scraping Melon data for song {song_name} by {artist_name}: {e}")
+            # 해석하지 못한 페이지가 캐시에 남으면 재시도해도 같은 페이지를 받으므로 지운다
+            self.http.invalidate(url)
+            return None
 
-                # 장르, 발매일, 앨범 이미지 URL 추출
+        if release_date:
+            release_date = self.extract_year(release_date)
+
+        detail = (genre, release_date, album_image_url)
+        if self.album_cache is not None and album_id:
+            self.album_cache.put(album_id, detail, song_id=melon_song_id)
+        return detail
+
+    def group_by_album(self, songs):
+        """상세 정보를 받을 곡을 멜론 앨범별로 묶어 (앨범 캐시로 채울 수 있는 (곡, 상세 정보) 목록, 곡 묶음 목록)을 반환.
+        앨범을 모르는 곡은 한 곡짜리 묶음이 된다."""
+        if self.album_cache is None:
+            return [], [[song] for song in songs]
+        album_ids = self.album_cache.albums_of(song['melon_song_id'] for song in songs)
+        details = self.album_cache.get_many(album_ids.values())
+
+        cached = []
+        groups = {}
+        for song in songs:
+            album_id = album_ids.get(str(song['melon_song_id']))
+            if album_id in details:
+                cached.append((song, details[album_id]))
+            else:
+                groups.setdefault(album_id or ('song', song['song_number']), []).append(song)
+        self.metrics.inc('melon_detail_total', len(cached), source='album_cache')
+        return cached, list(groups.values())
+
+    def fetch_album_detail(self, song, pace=False):
+        """앨범 캐시에 같은 앨범 정보가 있으면 그 값을, 없으면 상세 페이지를 받아 반환 (스트리밍 파이프라인용)."""
+        cached, _ = self.group_by_album([song])
+        if cached:
+            return cached[0][1]
+        return self.fetch_melon_song_detail(song, pace)
+
+    def create_bulk_updater(self, connection, on_flush=None):
+        return BulkUpdater(connection, flush_size=self.db_flush_size, flush_interval=self.db_flush_interval,
+                           on_flush=on_flush, metrics=self.metrics)
+
+    def update_genre_date_album(self, song, detail, updater):
+        """상세 페이지에서 추출한 정보로 song_info 업데이트를 예약. DB 오류는 단계 전체를 중단시킨다."""
+        genre, release_date, album_image_url = detail
+        updater.add(song['song_number'], {
+            'melon_song_id': song['melon_song_id'],
+            'genre': genre,
+            'year': release_date,
+            'album': album_image_url,
+        })
+        logger.info(f"Queued update for song {song['song_name']} by {song['artist_name']}")
+
+    def apply_album_detail(self, songs, detail, updater, outcomes):
+        """한 곡의 상세 페이지에서 얻은 앨범 정보를 같은 앨범의 곡들에 반영."""
+        for song in songs:
+            outcomes[str(song['song_number'])] = (detail, None)
+            self.update_genre_date_album(song, detail, updater)
+
+    @timed('process_batch_genre_date_album')
+    def process_batch_genre_date_album(self, batch, updater):
+        """20개 단위로 멜론 데이터를 처리하고 업데이트합니다.
+        같은 앨범의 곡은 상세 페이지를 한 번만 받고, 앨범 캐시에 있는 곡은 받지 않습니다.
+        곡 번호별 (상세 정보 또는 None, 오류 또는 None)을 반환합니다."""
+        outcomes = {}
+        cached, groups = self.group_by_album(batch)
+        for song, detail in cached:
+            self.apply_album_detail([song], detail, updater, outcomes)
+
+        for group in groups:
+            # 앞의 곡이 실패하면 같은 앨범의 다음 곡으로 다시 시도
+            for i, song in enumerate(group):
                 try:
-                    genre = soup.select_one('dt:contains("장르") + dd').text.strip()
-                    release_date = soup.select_one('#downloadfrm > div > div > div:nth-of-type(2) > div:nth-of-type(2) > dl > dd:nth-of-type(2)').text.strip()
-                    album_image_url = soup.select_one('#downloadfrm > div > div > div:nth-of-type(1) > a > img')['src']
+                    detail = self.fetch_melon_song_detail(song, pace=True)
                 except Exception as e:
-                    logger.error(f"Error scraping Melon data for song {song_name} by {artist_name}: {e}")
+                    logger.error(f"Error processing batch for song {song['song_name']} by {song['artist_name']}: {e}")
+                    outcomes[str(song['song_number'])] = (None, e)
                     continue
 
-                if release_date:
-                    release_date = self.extract_year(release_date)
-
-                # 데이터 업데이트
+                outcomes[str(song['song_number'])] = (detail, None)
+                if detail is not None:
+                    self.metrics.inc('melon_detail_total', source='fetched')
+                    self.metrics.inc('melon_detail_total', len(group) - i - 1, source='album_shared')
+                    self.apply_album_detail(group[i:], detail, updater, outcomes)
+                    break
+        return outcomes
+
+    @timed('process_genre_date_album_concurrently')
+    def process_genre_date_album_concurrently(self, songs, updater):
+        """앨범마다 한 곡의 상세 페이지를 동시에 요청하고, 결과가 도착하는 순서대로 같은 앨범의 곡들을 업데이트합니다.
+        요청 간격은 고정 지연 대신 호스트별 속도 제한기가 조절합니다."""
+        outcomes = {}
+        cached, groups = self.group_by_album(songs)
+        for song, detail in cached:
+            self.apply_album_detail([song], detail, updater, outcomes)
+
+        while groups:
+            retry = []
+            for group, detail, error in self.run_concurrently(lambda group: self.fetch_melon_song_detail(group[0]), groups):
+                song = group[0]
+                outcomes[str(song['song_number'])] = (detail, error)
+                if error is not None:
+                    logger.error(f"Error processing song {song['song_name']} by {song['artist_name']}: {error}")
+                if error is not None or detail is None:
+                    # 같은 앨범의 다음 곡으로 다시 시도
+                    if len(group) > 1:
+                        retry.append(group[1:])
+                    continue
+                self.metrics.inc('melon_detail_total', source='fetched')
+                self.metrics.inc('melon_detail_total', len(group) - 1, source='album_shared')
+                self.apply_album_detail(group, detail, updater, outcomes)
+            groups = retry
+        return outcomes
+
+    def run_concurrently(self, func, items):
+        """최대 max_in_flight 개의 요청을 동시에 실행하고 (item, result, error)를 완료 순서대로 반환."""
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            futures = {executor.submit(func, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
                 try:
-                    update_query = """
-                        UPDATE song_info 
-                        SET melon_song_id = %s, genre = %s, year = %s, album = %s
-                        WHERE song_number = %s
-                    """
-                    cursor.execute(update_query, (
-                        melon_song_id, genre, release_date, album_image_url, song_number
-                    ))
-                    connection.commit()
-                    logger.info(f"Updated song {song_name} by {artist_name} in the database")
+                    yield item, future.result(), None
                 except Exception as e:
-                    logger.error(f"Error updating the database for song {song_name} by {artist_name}: {e}")
-                    connection.rollback()
-
-                time.sleep(random.randrange(12, 20))  # 12-20초 랜덤 지연
+                    yield item, None, e
 
-            except Exception as e:
-                logger.error(f"Error processing batch for song {song_name} by {artist_name}: {e}")
-                continue
-        
+    @timed('crawl_one_mr_and_live')
     def crawl_one_mr_and_live(self, song):
         try:
             print(f"db에 없는 {song[0]}, {song[1]}, {song[2]} 정보를 추가로 크롤링합니다.")
             song_number = song[0]
-            url = 'https://www.tjmedia.com/tjsong/song_search_list.asp?strType=16&natType=&strText='+str(song_number)+'&strCond=1&strSize05=100'
+            url = self.tj_base_url + '/tjsong/song_search_list.asp?strType=16&natType=&strText='+str(song_number)+'&strCond=1&strSize05=100'
 
             # POST 요청 보내기
-            response = requests.get(url)
+            response = self.http.get(url, cache_ttl=self.cache_ttls['tj_search'])
             html = response.content.decode('utf-8', 'replace')
             
-            # BeautifulSoup으로 HTML 파싱
-            soup = BeautifulSoup(html, 'html.parser')
-            
-            # 해당 위치의 song_number와 일치 여부 확인
-            song_number_element = soup.select_one("#BoardType1 > table > tbody > tr:nth-child(2) > td:nth-child(1)")
-
             # 기본값으로 MR과 Live 설정
             is_mr = False
             is_live = False
 
-            # song_number가 존재하고, 해당 요소의 텍스트와 일치하는지 확인
-            if song_number_element and song_number_element.text.strip() == str(song_number):
+            # 검색 결과에 song_number와 일치하는 행이 있는지 확인
+            flags = self.parse_mr_and_live_rows(html)
+            if str(song_number) in flags:
                 logger.info(f"곡 번호 {song_number}와 일치하는 곡이 발견되었습니다.")
-                
-                # 곡 정보가 담긴 테이블을 찾고, 태그 확인
-                song_info = soup.find('table', {'class': 'board_type1'})
-                
-                # 태그 정보가 있는 경우에만 처리
-                if song_info:
-                    # "live"와 "mr" 태그가 있는지 확인
-                    live_tag = song_info.find_all('img', {'src': '/images/tjsong/live_icon.png'})
-                    mr_tag = song_info.find_all('img', {'src': '/images/tjsong/mr_icon.png'})
-                    
-                    is_live = len(live_tag) > 0
-                    is_mr = len(mr_tag) > 0
-                else:
-                    logger.warning(f"곡 번호 {song_number}의 테이블 정보를 찾을 수 없습니다. 기본값(MR=False, Live=False)으로 설정합니다.")
+                is_mr, is_live = flags[str(song_number)]
             else:
                 logger.warning(f"곡 번호 {song_number}와 일치하는 곡을 찾을 수 없습니다. 기본값(MR=False, Live=False)으로 설정합니다.")
 
@@ -347,73 +1070,34 @@ class TJCrawlingService:
             
         except Exception as e:
             logger.error(f"MR 및 Live 정보 크롤링 중 오류 발생: {e}")
+            self.metrics.inc('stage_errors_total', stage='crawl_one_mr_and_live', error=type(e).__name__)
             # 예외 발생 시에도 기본값으로 반환
             return (song[0], song[1], song[2], False, False)
 
-    def crawl_melon_song_id_and_album(self, songs):
+    @timed('crawl_melon_song_id_and_album')
+    def crawl_melon_song_id_and_album(self, songs, mode=None):
         try:
             batch_size = 20
-            connection = self.setup_db_config()
-            cursor = connection.cursor()
 
-            for i in range(0, len(songs), batch_size):
-                batch = songs[i:i + batch_size]
-                self.process_batch(batch, cursor, connection)
+            with self.sink.updates() as updater:
+                outcomes = {}
+                if (mode or self.crawl_mode) == 'concurrent':
+                    outcomes.update(self.process_songs_concurrently(songs, updater))
+                else:
+                    for i in range(0, len(songs), batch_size):
+                        batch = songs[i:i + batch_size]
+                        outcomes.update(self.process_batch(batch, updater))
+                updater.flush()
+            return outcomes
             
         except Exception as e:
             logger.error(f"멜론 곡 ID 및 앨범 이미지 크롤링 중 오류 발생: {e}")
             raise
-        finally:
-            cursor.close()
-            connection.close()
 
     def find_highest_similarity_match(self, title, artist, results):
-        """유사도가 0.6 이상인 항목 중 가장 높은 유사한 항목 선택."""
-
-        def remove_spaces_if_korean(text):
-            # 텍스트가 모두 한글인 경우 띄어쓰기를 제거
-            if re.fullmatch(r'[가-힣]+', text.replace(" ", "")):
-                return text.replace(" ", "")
-            return text
-    
-        def remove_brackets(text):
-            # 괄호와 괄호 안의 내용을 제거
-            return re.sub(r'\(.*?\)', '', text).strip()
-
+        """유사도 기준을 통과한 항목 중 가장 높은 유사한 항목 선택 (같은 유사도인 경우 첫 번째 항목)."""
         try:
-            valid_matches = []
-
-            # title과 artist에 한국어가 포함된 경우 띄어쓰기 제거
-            title = remove_spaces_if_korean(title.strip())
-            artist = remove_spaces_if_korean(artist.strip())
-
-            # 유사도 계산 후 0.6 이상인 항목 추가
-            for result in results:
-                result_song_name, result_artist_name, result_song_id = result
-                result_artist_name = remove_brackets(result_artist_name)  # 괄호 안의 내용 제거
-                result_song_name = remove_brackets(result_song_name)  # 괄호 안의 내용 제거
-
-                song_name_similarity = fuzz.ratio(title.lower(), result_song_name.lower().strip()) / 100
-                artist_name_similarity = fuzz.ratio(artist.lower(), result_artist_name.lower().strip()) / 100
-                avg_similarity = (song_name_similarity + artist_name_similarity) / 2
-
-                if song_name_similarity >= 0.5 and artist_name_similarity >= 0.25 and avg_similarity >= 0.5:
-                    valid_matches.append((avg_similarity, result_song_name, result_artist_name, result_song_id))
-                
-                print(f"TJ Title: {title}, Title: {result_song_name}, TJ Artist: {artist}, Arist: {result_artist_name}, Song Name Similarity: {song_name_similarity}, Aritst Similiarity: {artist_name_similarity}, AVG Similarity: {avg_similarity}")
-
-            # 가장 유사도가 높은 항목 선택 (같은 유사도인 경우 첫 번째 항목 사용)
-            if valid_matches:
-                best_match = max(valid_matches, key=lambda x: x[0])  # 유사도 가장 높은 항목
-                highest_similarity = best_match[0]
-
-                # 동일한 유사도가 여러 개일 경우 첫 번째 항목 선택
-                for match in valid_matches:
-                    if match[0] == highest_similarity:
-                        return match  # 가장 먼저 추가된 항목 반환
-
-            # 유사한 항목이 없을 경우 None 반환
-            return None
+            return song_matcher.find_best_match(title, artist, results)
         except Exception as e:
             logger.error(f"Error finding the highest similarity match: {e}")
             return None
@@ -442,117 +1126,146 @@ class TJCrawlingService:
         """아티스트 이름에서 괄호와 그 안의 내용 제거."""
         return re.sub(r'\([^)]*\)', '', artist_name).strip()  # 괄호와 내용 제거 후 공백 제거
 
-    def process_batch(self, batch, cursor, connection):
-        """20개 단위로 멜론 데이터를 BeautifulSoup으로 처리하고 업데이트합니다."""
-        
-        def search_melon(title, artist):
-            """멜론에서 노래와 아티스트로 검색을 수행"""
-            headers = {
-                "User-Agent": random.choice([
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.5735.110 Safari/537.36",
-                    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0"
-                ])
-            }
-            search_url = f'https://www.melon.com/search/song/index.htm?q={title}+{artist}'
-            response = requests.get(search_url, headers=headers)
-            time.sleep(random.uniform(1, 3))  # 페이지 로딩 대기
+    @timed('search_melon')
+    def search_melon(self, title, artist, pace=True):
+        """멜론에서 노래와 아티스트로 검색을 수행하고 상위 3개의 (곡 이름, 아티스트 이름, 곡 ID)를 반환"""
+        headers = {
+            "User-Agent": random.choice([
+                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.5735.110 Safari/537.36",
+                "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:89.0) Gecko/20100101 Firefox/89.0"
+            ])
+        }
+        search_url = f'{self.melon_base_url}/search/song/index.htm?q={title}+{artist}'
+        response = self.http.get(search_url, headers=headers, cache_ttl=self.cache_ttls['melon_search'])
+        if pace and not getattr(response, 'from_cache', False):
+            self.pause(random.uniform(1, 3), 'melon_search')  # 페이지 로딩 대기 (캐시 적중 시 생략)
 
-            if response.status_code != 200:
-                print(f"Failed to fetch page for {title} by {artist}: Status code {response.status_code}")
-                return []
+        if response.status_code != 200:
+            print(f"Failed to fetch page for {title} by {artist}: Status code {response.status_code}")
+            return []
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # 상위 3개의 결과 추출
-            rows = soup.select('#frm_defaultList > div > table > tbody > tr')[:3]
-            return rows
+        # 상위 3개의 결과 추출
+        try:
+            with self.metrics.timer('parse_duration_seconds', page='melon_search'):
+                search_results = self.parser.parse_melon_search(response.text, limit=3, with_album=True)
+        except Exception:
+            self.http.invalidate(search_url)
+            raise
+        if not search_results:
+            # 결과가 없는 페이지는 구조가 바뀐 페이지와 구분할 수 없으므로 캐시에 남기지 않는다
+            self.http.invalidate(search_url)
+        if self.album_cache is not None:
+            self.album_cache.link((song_id, album_id) for _, _, song_id, album_id in search_results)
+        search_results = [result[:3] for result in search_results]
+        for song_name, artist_name, song_id in search_results:
+            print(f"Song Name: {song_name}, Artist Name: {artist_name}, Song ID: {song_id}")
+
+        if self.melon_index is not None:
+            self.melon_index.add(search_results)
+
+        return search_results
+
+    @timed('find_melon_song_id')
+    def find_melon_song_id(self, song, pace=True):
+        """제목/아티스트 조합을 바꿔가며 멜론을 검색하고 가장 유사한 결과를 반환. 없으면 None.
+        어느 단계(tier)에서 결과를 찾았는지 melon_match_total{tier, result} 에 기록한다."""
+        title = song[1]
+        artist = self.clean_artist_name(song[2])  # 아티스트 이름 정리
+        current_artist_name = artist
+        artist_with_english = self.extract_parentheses_content(song[2])  # 괄호 안의 내용 추출
+
+        # 0. 로컬 색인에서 먼저 찾고, 없을 때만 멜론 검색
+        if self.melon_index is not None:
+            best_match = self.melon_index.find_match(title, [artist, artist_with_english, song[2]])
+            if best_match:
+                print(f"Index Match: {best_match[1]} Artist: {best_match[2]}, Song ID: {best_match[3]}")
+                self.metrics.inc('melon_match_total', tier='index', result='matched')
+                return best_match
+
+        if pace:
+            self.pause(1, 'melon_search')  # 1초 대기 (random delay)
+
+        # 1. 기본적으로 제목과 정리된 아티스트 이름으로 검색
+        search_results = self.search_melon(title, artist, pace)
+        tier = 'title_artist'
+
+        # 3. 여전히 결과가 없으면 괄호 안의 내용(영어 이름)으로 검색
+        if not search_results and artist_with_english:
+            search_results = self.search_melon(title, artist_with_english, pace)
+            current_artist_name = artist_with_english
+            tier = 'english_artist'
+
+        # 4. 여전히 결과가 없으면 원래 아티스트 이름으로 다시 검색
+        if not search_results:
+            search_results = self.search_melon(title, song[2], pace)
+            current_artist_name = song[2]
+            tier = 'original_artist'
+
+        # 5. 최종적으로 결과가 없으면 제목만으로 검색
+        if not search_results:
+            search_results = self.search_melon(title, "", pace)
+            current_artist_name = artist
+            tier = 'title_only'
+
+        if not search_results:
+            print(f"No results found for {title} by {artist}")
+            self.metrics.inc('melon_match_total', tier='none', result='no_results')
+            return None
+
+        print(f"Found {len(search_results)} results for {title} by {artist}")
 
+        # 가장 유사한 검색 결과 찾기
+        best_match = self.find_highest_similarity_match(title, current_artist_name, search_results)
+        if not best_match:
+            print(f"No suitable match found for {title} by {artist}")
+            self.metrics.inc('melon_match_total', tier=tier, result='no_match')
+            return None
+
+        _, result_title, result_artist, best_song_id = best_match
+        print(f"Best Match: {result_title} Artist: {result_artist}, Song ID: {best_song_id}")
+        self.metrics.inc('melon_match_total', tier=tier, result='matched')
+        return best_match
+
+    def update_melon_song_id(self, song, best_song_id, updater):
+        """매칭된 멜론 곡 ID 저장을 예약."""
+        updater.add(song[0], {'melon_song_id': best_song_id})
+        logger.info(f"Queued Song ID {best_song_id} for {song[1]} by {song[2]}")
+
+    @timed('process_batch')
+    def process_batch(self, batch, updater):
+        """20개 단위로 멜론 데이터를 처리하고 업데이트합니다.
+        곡 번호별 (멜론 곡 ID 또는 None, 오류 또는 None)을 반환합니다."""
+        outcomes = {}
         for song in batch:
             try:
                 print(f"Processing {song[1]} by {song[2]}")
-                time.sleep(1)  # 1초 대기 (random delay)
-
-                title = song[1]
-                artist = self.clean_artist_name(song[2])  # 아티스트 이름 정리
-                current_artist_name = artist
-                artist_with_english = self.extract_parentheses_content(song[2])  # 괄호 안의 내용 추출
-                song_number = song[0]
-
-                # 1. 기본적으로 제목과 정리된 아티스트 이름으로 검색
-                rows = search_melon(title, artist)
-
-                # 3. 여전히 결과가 없으면 괄호 안의 내용(영어 이름)으로 검색
-                if not rows and artist_with_english:
-                    rows = search_melon(title, artist_with_english)
-                    current_artist_name = artist_with_english
-
-                # 4. 여전히 결과가 없으면 원래 아티스트 이름으로 다시 검색
-                if not rows:
-                    rows = search_melon(title, song[2])
-                    current_artist_name = song[2]
-
-                # 5. 최종적으로 결과가 없으면 제목만으로 검색
-                if not rows:
-                    rows = search_melon(title, "")
-                    current_artist_name = artist
-
-                if rows:
-                    print(f"Found {len(rows)} results for {title} by {artist}")
-                    
-                    search_results = []
-                    
-                    for row in rows:
-                        try:
-                            # 곡 이름 추출
-                            song_name_tag = row.select_one('td:nth-of-type(3) a.fc_gray')
-                            song_name = song_name_tag.text.strip() if song_name_tag else None
-                            song_id = None
-
-                            # 곡 ID 추출 (JavaScript 함수의 파라미터에서 추출)
-                            link_element = row.select_one('td:nth-of-type(3) a.btn_icon_detail')
-                            if link_element:
-                                href = link_element['href']
-                                match = re.search(r"searchLog\('web_song','SONG','SO','([^']+)','(\d+)'\);", href)
-                                if match:
-                                    song_id = match.group(2)
-                                    print(f"Song ID: {song_id}")
-                                else:
-                                    print(f"No song ID found in the link: {href}")
-
-                            # 아티스트 이름 추출
-                            artist_name_tag = row.select_one('td:nth-of-type(4) div > div')
-                            artist_name = artist_name_tag.text.strip() if artist_name_tag else None
-                            print(f"Song Name: {song_name}, Artist Name: {artist_name}")
-
-                            # 검색 결과에 추가
-                            if song_name and artist_name:
-                                search_results.append((song_name, artist_name, song_id))
-                        except Exception as e:
-                            print(f"Error fetching song info: {e}")
-                            continue
-
-                    # 가장 유사한 검색 결과 찾기
-                    best_match = self.find_highest_similarity_match(title, current_artist_name, search_results)
-                    if best_match:
-                        _, result_title, result_artist, best_song_id = best_match
-                        print(f"Best Match: {result_title} Artist: {result_artist}, Song ID: {best_song_id}")
-
-                        # 데이터베이스에 업데이트
-                        update_query = """
-                            UPDATE song_info 
-                            SET melon_song_id = %s 
-                            WHERE song_number = %s
-                        """
-                        cursor.execute(update_query, (best_song_id, song_number))
-                        connection.commit()
-                        logger.info(f"Updated Song ID {best_song_id} for {title} by {artist}")
-                    else:
-                        print(f"No suitable match found for {title} by {artist}")
-
-                else:
-                    print(f"No results found for {title} by {artist}")
 
+                best_match = self.find_melon_song_id(song)
             except Exception as e:
-                logger.error(f"Failed to retrieve the Song ID for {title} by {artist}: {e}")
+                logger.error(f"Failed to retrieve the Song ID for {song[1]} by {song[2]}: {e}")
+                outcomes[str(song[0])] = (None, e)
                 continue
-            
+
+            best_song_id = best_match[3] if best_match else None
+            outcomes[str(song[0])] = (best_song_id, None)
+            if best_song_id:
+                self.update_melon_song_id(song, best_song_id, updater)
+        return outcomes
+
+    @timed('process_songs_concurrently')
+    def process_songs_concurrently(self, songs, updater):
+        """멜론 검색을 동시에 실행하고, 매칭 결과가 도착하는 순서대로 DB 를 업데이트합니다.
+        요청 간격은 고정 지연 대신 호스트별 속도 제한기가 조절합니다."""
+        outcomes = {}
+        search = lambda song: self.find_melon_song_id(song, pace=False)
+        for song, best_match, error in self.run_concurrently(search, songs):
+            if error is not None:
+                logger.error(f"Failed to retrieve the Song ID for {song[1]} by {song[2]}: {error}")
+                outcomes[str(song[0])] = (None, error)
+                continue
+
+            best_song_id = best_match[3] if best_match else None
+            outcomes[str(song[0])] = (best_song_id, None)
+            if best_song_id:
+                self.update_melon_song_id(song, best_song_id, updater)
+        return outcomes
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from state_db import open_state_db
+
+
+class AlbumCache:
+    """멜론 곡 ID → 앨범 ID 와 앨범별 (장르, 발매 연도, 앨범 이미지 URL)을 sqlite 파일에 저장.
+
+    - 곡 ID → 앨범 ID 는 멜론 검색 결과와 상세 페이지에서 기록한다
+    - 앨범 정보는 상세 페이지를 받을 때마다 기록하고 ttl 초 동안 같은 앨범의 다른 곡에 재사용한다
+    """
+
+    def __init__(self, path, ttl=30 * 24 * 3600.0):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.db = open_state_db(path, shared=True)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS song_albums (
+                song_id TEXT PRIMARY KEY,
+                album_id TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS albums (
+                album_id TEXT PRIMARY KEY,
+                genre TEXT,
+                year INTEGER,
+                album_image_url TEXT,
+                fetched_at REAL NOT NULL
+            );
+        """)
+        self.db.commit()
+
+    def link(self, pairs):
+        """pairs: (곡 ID, 앨범 ID) 목록."""
+        rows = [(str(song_id), str(album_id)) for song_id, album_id in pairs if song_id and album_id]
+        if not rows:
+            return
+        with self.lock:
+            self.db.executemany("INSERT OR REPLACE INTO song_albums (song_id, album_id) VALUES (?, ?)", rows)
+            self.db.commit()
+
+    def albums_of(self, song_ids):
+        """{곡 ID: 앨범 ID}. 앨범을 모르는 곡은 포함하지 않는다."""
+        song_ids = list({str(song_id) for song_id in song_ids if song_id})
+        if not song_ids:
+            return {}
+        with self.lock:
+            return dict(self.db.execute(
+                "SELECT song_id, album_id FROM song_albums WHERE song_id IN ({})".format(','.join(['?'] * len(song_ids))),
+                song_ids,
+            ).fetchall())
+
+    def get_many(self, album_ids):
+        """{앨범 ID: (장르, 발매 연도, 앨범 이미지 URL)}. ttl 이 지난 앨범은 포함하지 않는다."""
+        album_ids = list({str(album_id) for album_id in album_ids if album_id})
+        if not album_ids:
+            return {}
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT album_id, genre, year, album_image_url FROM albums "
+                "WHERE fetched_at >= ? AND album_id IN ({})".format(','.join(['?'] * len(album_ids))),
+                [time.time() - self.ttl] + album_ids,
+            ).fetchall()
+        return {album_id: (genre, year, album_image_url) for album_id, genre, year, album_image_url in rows}
+
+    def put(self, album_id, detail, song_id=None):
+        """상세 페이지에서 얻은 앨범 정보를 기록. song_id 가 주어지면 곡 ID → 앨범 ID 도 기록한다."""
+        genre, year, album_image_url = detail
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO albums (album_id, genre, year, album_image_url, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (str(album_id), genre, year, album_image_url, time.time()),
+            )
+            if song_id:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO song_albums (song_id, album_id) VALUES (?, ?)", (str(song_id), str(album_id))
+                )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
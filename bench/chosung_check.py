@@ -0,0 +1,98 @@
+"""chosung 모듈이 기존 TJCrawlingService.get_chosung 과 같은 결과를 내는지 무작위 문자열로 확인.
+
+    python bench/chosung_check.py [-n 문자열 수] [--seed 시드]
+
+- get_chosung(keep='none') 과 기존 구현(reference_chosung)
+- 모든 keep 방식에서 chosung_many 와 문자열마다 get_chosung 을 호출한 결과 (numpy 경로와 str.translate 경로 모두)
+를 비교하고, 다르면 종료 코드 1.
+"""
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import chosung  # noqa: E402
+
+# 완성형 한글 경계, 자모, 영문/숫자, 공백/문장 부호, 밑줄, 다른 문자 체계, 이모지, 구분자와 짝 없는 surrogate
+ALPHABET = (['가', '힣', '각', '뷁', '똠', '쀍', 'ㄱ', 'ㅏ', 'ㆍ', 'a', 'Z', '0', '9', ' ', '  ', '.', '(', ')', '-', '_',
+             '&', "'", '漢', 'あ', 'é', 'ß', '٣', '\t', '😀', ' '])
+RARE = ['\x00', '\ud800']
+
+
+def reference_chosung(text):
+    """기존 TJCrawlingService.get_chosung (비한글은 버림)."""
+    CHOSUNG_LIST = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ',
+                    'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+    result = []
+    for char in text:
+        if '가' <= char <= '힣':
+            code = ord(char) - ord('가')
+            result.append(CHOSUNG_LIST[code // 588])
+        else:
+            result.append('')
+    return ''.join(result)
+
+
+def random_text(rng, rare=False):
+    """rare 이면 구분자 또는 짝 없는 surrogate 를 한 글자 넣는다 (chosung_many 가 다른 경로로 처리하는 입력)."""
+    chars = []
+    for _ in range(rng.randint(0, 20)):
+        if rng.random() < 0.5:
+            chars.append(chr(rng.randint(chosung.HANGUL_START, chosung.HANGUL_END)))
+        else:
+            chars.append(rng.choice(ALPHABET))
+    if rare:
+        chars.insert(rng.randint(0, len(chars)), rng.choice(RARE))
+    return ''.join(chars)
+
+
+def check_many(texts, label, batch_size=500):
+    mismatches = 0
+    for keep in chosung.KEEP_MODES:
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            expected = [chosung.get_chosung(text, keep) for text in batch]
+            if chosung.chosung_many(batch, keep) != expected:
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"다름: chosung_many({label}, keep={keep}) 배치 {i // batch_size}")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--strings', type=int, default=30000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # 특수 문자가 든 문자열은 끝에 모아 두어 나머지 배치는 numpy / translate 경로를 타게 한다
+    rare_count = max(1, args.strings // 100)
+    texts = ([random_text(rng) for _ in range(args.strings - rare_count)]
+             + [random_text(rng, rare=True) for _ in range(rare_count)])
+
+    mismatches = 0
+    for text in texts:
+        if chosung.get_chosung(text) != reference_chosung(text):
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"다름: get_chosung({text!r}) = {chosung.get_chosung(text)!r}, 기존 {reference_chosung(text)!r}")
+
+    if chosung.np is not None:
+        mismatches += check_many(texts, 'numpy')
+    else:
+        print("numpy 가 설치되어 있지 않아 str.translate 경로만 확인합니다.")
+    np, chosung.np = chosung.np, None
+    try:
+        mismatches += check_many(texts, 'translate')
+    finally:
+        chosung.np = np
+
+    print(f"{len(texts)}개 문자열, 결과가 다른 경우 {mismatches}개")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""TJCrawlingService.crawl_and_save_new_songs 를 로컬 모의 서버와 sqlite DB 로 끝까지 실행하는 벤치마크.
+
+    python bench/crawl_bench.py [--songs 200] [--existing 0.5] [--latency 0.02] [--error-rate 0.01]
+                                [--crawl-mode concurrent] [--pipeline-mode staged] [--json] [--metrics PATH]
+
+songs/sec, 곡당 HTTP 요청 수, 곡당 DB 왕복 수, 단계별 p50/p99 지연을 출력한다.
+실제 서비스의 호출 예절(지연, 속도 제한)은 측정 대상이 아니므로 기본값으로 크게 완화해서 실행한다.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+from mock_server import MockState, build_dataset, make_server  # noqa: E402
+from sqlite_db import SqliteDatabase  # noqa: E402
+
+# 지연 시간을 잴 서비스 메서드 (단계)
+STAGE_METHODS = [
+    'crawl_new_songs',
+    'find_missing_songs',
+    'crawl_mr_and_live_by_artist',
+    'crawl_one_mr_and_live',
+    'save_to_db',
+    'find_melon_song_id',
+    'search_melon',
+    'fetch_melon_song_detail',
+]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(p / 100 * len(values) + 0.5)) - 1))
+    return values[index]
+
+
+def instrument(service, timings, lock):
+    """서비스 인스턴스의 단계 메서드를 감싸 호출마다 걸린 시간을 기록."""
+    for name in STAGE_METHODS:
+        method = getattr(service, name)
+
+        def timed(*args, __method=method, __name=name, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return __method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with lock:
+                    timings.setdefault(__name, []).append(elapsed)
+
+        setattr(service, name, timed)
+
+
+def configure_environment(args, base_url, state_dir):
+    os.environ.update({
+        'TJ_BASE_URL': base_url,
+        'MELON_BASE_URL': base_url,
+        'CRAWL_MODE': args.crawl_mode,
+        'PIPELINE_MODE': args.pipeline_mode,
+        'MAX_IN_FLIGHT': str(args.max_in_flight),
+        'MELON_RATE': str(args.rate),
+        'TJ_RATE': str(args.rate),
+        'RATE_BURST': str(args.max_in_flight),
+        'HTTP_BACKOFF': '0.01',
+        'HTTP_CACHE': '1' if args.cache else '0',
+        'HTTP_CACHE_PATH': os.path.join(state_dir, 'http_cache.sqlite'),
+        'WORK_QUEUE_PATH': os.path.join(state_dir, 'work_queue.sqlite'),
+        'MELON_INDEX': '1' if args.index else '0',
+        'MELON_INDEX_PATH': os.path.join(state_dir, 'melon_index.sqlite'),
+        'MONTH_SNAPSHOT_PATH': os.path.join(state_dir, 'month_lists.sqlite'),
+        'ALBUM_CACHE_PATH': os.path.join(state_dir, 'album_cache.sqlite'),
+        'SWEEP_STATE_PATH': os.path.join(state_dir, 'sweep.sqlite'),
+        'THROTTLE': args.throttle,
+        'THROTTLE_STATE_PATH': os.path.join(state_dir, 'throttle.json'),
+    })
+
+
+def run(args):
+    songs = build_dataset(args.songs, seed=args.seed)
+    state = MockState(songs, latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+    server, base_url = make_server(state)
+
+    database = SqliteDatabase()
+    existing_count = int(len(songs) * args.existing)
+    database.seed([song[:3] for song in songs[:existing_count]])
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        configure_environment(args, base_url, state_dir)
+        from TJCrawlingService import TJCrawlingService
+
+        service = TJCrawlingService()
+        service.setup_db_config = database.connect
+        if args.crawl_mode == 'sequential':
+            # 순차 모드의 고정 지연(time.sleep)은 측정에서 제외 (서비스 모듈의 time 만 교체)
+            import types
+            import TJCrawlingService as service_module
+            service_module.time = types.SimpleNamespace(sleep=lambda seconds: None)
+
+        timings = {}
+        instrument(service, timings, threading.Lock())
+
+        started_at = time.perf_counter()
+        service.crawl_and_save_new_songs()
+        elapsed = time.perf_counter() - started_at
+        service.close()
+        if args.metrics:
+            service.metrics.write(args.metrics)
+
+    server.shutdown()
+
+    new_songs = len(songs) - existing_count
+    per_song = max(new_songs, 1)
+    # 데이터셋의 정답 멜론 곡 ID 와 비교 (NULL 이 아니어도 다른 곡의 ID 일 수 있음)
+    expected_ids = {song[0]: song[3] for song in songs[existing_count:]}
+    saved_ids = database.column_values('melon_song_id')
+    correct = sum(1 for number, melon_song_id in expected_ids.items()
+                  if saved_ids.get(number) is not None and str(saved_ids[number]) == melon_song_id)
+    wrong = sum(1 for number in expected_ids if saved_ids.get(number) is not None) - correct
+    return {
+        'songs': len(songs),
+        'new_songs': new_songs,
+        'elapsed_sec': round(elapsed, 3),
+        'songs_per_sec': round(new_songs / elapsed, 2) if elapsed else None,
+        'http_requests': dict(state.requests),
+        'requests_per_song': round(sum(state.requests.values()) / per_song, 2),
+        'bytes_downloaded': state.bytes_sent,
+        'db_connections': database.connections,
+        'db_round_trips': database.round_trips,
+        'db_round_trips_per_song': round(database.round_trips / per_song, 2),
+        'melon_song_id_filled': database.count_rows('melon_song_id IS NOT NULL'),
+        'melon_song_id_correct': correct,
+        'melon_song_id_wrong': wrong,
+        'match_accuracy': round(correct / per_song, 4),
+        'genre_filled': database.count_rows('genre IS NOT NULL'),
+        'stages': {
+            name: {
+                'calls': len(values),
+                'p50_ms': round(percentile(values, 50) * 1000, 2),
+                'p99_ms': round(percentile(values, 99) * 1000, 2),
+            }
+            for name, values in sorted(timings.items())
+        },
+    }
+
+
+def print_report(report):
+    print(f"신곡 {report['new_songs']}/{report['songs']}개, {report['elapsed_sec']}초, {report['songs_per_sec']} songs/sec")
+    print(f"HTTP 요청 {sum(report['http_requests'].values())}회 ({report['requests_per_song']}/song): {report['http_requests']}")
+    print(f"다운로드 {report['bytes_downloaded']} bytes")
+    print(f"DB 연결 {report['db_connections']}회, 왕복 {report['db_round_trips']}회 ({report['db_round_trips_per_song']}/song)")
+    print(f"melon_song_id 채움 {report['melon_song_id_filled']} (정답 {report['melon_song_id_correct']}, "
+          f"오답 {report['melon_song_id_wrong']}, 정확도 {report['match_accuracy']}), genre 채움 {report['genre_filled']}")
+    print(f"{'stage':<30}{'calls':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, stage in report['stages'].items():
+        print(f"{name:<30}{stage['calls']:>8}{stage['p50_ms']:>10}{stage['p99_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--songs', type=int, default=200, help="newSongOfMonth 가 반환할 곡 수")
+    parser.add_argument('--existing', type=float, default=0.0, help="이미 DB 에 있는 곡의 비율")
+    parser.add_argument('--latency', type=float, default=0.02, help="모의 서버 응답 지연(초)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="모의 서버가 503 을 응답할 확률")
+    parser.add_argument('--crawl-mode', default='concurrent', choices=['sequential', 'concurrent'])
+    parser.add_argument('--pipeline-mode', default='staged', choices=['staged', 'streaming'])
+    parser.add_argument('--max-in-flight', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=1000.0, help="호스트별 초당 요청 수 제한")
+    parser.add_argument('--throttle', default='fixed', choices=['fixed', 'adaptive'])
+    parser.add_argument('--cache', action='store_true', help="응답 캐시 사용")
+    parser.add_argument('--no-index', dest='index', action='store_false', help="멜론 로컬 색인 사용 안 함")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="결과를 JSON 으로 출력")
+    parser.add_argument('--metrics', help="서비스 메트릭을 기록할 파일 (.prom 이면 Prometheus 형식)")
+    parser.add_argument('--min-songs-per-sec', type=float, help="이보다 느리면 종료 코드 1")
+    parser.add_argument('--max-requests-per-song', type=float, help="이보다 많으면 종료 코드 1")
+    parser.add_argument('--max-db-round-trips-per-song', type=float, help="이보다 많으면 종료 코드 1")
+    parser.add_argument('--min-match-accuracy', type=float,
+                        help="새 곡 중 정답 melon_song_id 가 저장된 비율이 이보다 낮으면 종료 코드 1")
+    args = parser.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+    # 성능 회귀 검사 (배포 전 CI 등에서 사용)
+    failures = []
+    if args.min_songs_per_sec is not None and report['songs_per_sec'] < args.min_songs_per_sec:
+        failures.append(f"songs/sec {report['songs_per_sec']} < {args.min_songs_per_sec}")
+    if args.max_requests_per_song is not None and report['requests_per_song'] > args.max_requests_per_song:
+        failures.append(f"requests/song {report['requests_per_song']} > {args.max_requests_per_song}")
+    if (args.max_db_round_trips_per_song is not None
+            and report['db_round_trips_per_song'] > args.max_db_round_trips_per_song):
+        failures.append(f"db round trips/song {report['db_round_trips_per_song']} > {args.max_db_round_trips_per_song}")
+    if args.min_match_accuracy is not None and report['match_accuracy'] < args.min_match_accuracy:
+        failures.append(f"match accuracy {report['match_accuracy']} < {args.min_match_accuracy}")
+    if failures:
+        print("성능 회귀: " + ", ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""song_matcher 가 기존 TJCrawlingService.find_highest_similarity_match 와 같은 결과를 내는지 무작위 입력으로 확인.
+
+    python bench/matcher_check.py [-n 곡 수] [--seed 시드]
+
+기존 구현(fuzzywuzzy 점수)을 그대로 옮긴 reference_match 와
+song_matcher.find_best_match / find_best_matches 의 결과를 비교하고, 다르면 종료 코드 1.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fuzzywuzzy import fuzz  # noqa: E402
+
+import song_matcher  # noqa: E402
+
+WORDS = ['사랑', '이별', '너', '나의 봄', '밤', '그대', '하루', '눈물', 'Love', 'love', 'Butter', 'Day', 'Spring',
+         'Dynamite', 'NIGHT', 'blue', 'Hello', '아이유', 'IU', '방탄소년단', 'BTS', '뉴진스', 'NewJeans', '1', '2', '!']
+DECORATIONS = ['', '', '', ' (Feat. 아이유)', ' (Prod. BTS)', '(Inst.)', ' (Live)', '  ', ' (한글)']
+
+
+def reference_match(title, artist, results):
+    """기존 find_highest_similarity_match 의 매칭 규칙 (출력 제외)."""
+
+    def remove_spaces_if_korean(text):
+        if re.fullmatch(r'[가-힣]+', text.replace(" ", "")):
+            return text.replace(" ", "")
+        return text
+
+    def remove_brackets(text):
+        return re.sub(r'\(.*?\)', '', text).strip()
+
+    valid_matches = []
+    title = remove_spaces_if_korean(title.strip())
+    artist = remove_spaces_if_korean(artist.strip())
+    for result_song_name, result_artist_name, result_song_id in results:
+        result_artist_name = remove_brackets(result_artist_name)
+        result_song_name = remove_brackets(result_song_name)
+        song_name_similarity = fuzz.ratio(title.lower(), result_song_name.lower().strip()) / 100
+        artist_name_similarity = fuzz.ratio(artist.lower(), result_artist_name.lower().strip()) / 100
+        avg_similarity = (song_name_similarity + artist_name_similarity) / 2
+        if song_name_similarity >= 0.5 and artist_name_similarity >= 0.25 and avg_similarity >= 0.5:
+            valid_matches.append((avg_similarity, result_song_name, result_artist_name, result_song_id))
+
+    if valid_matches:
+        highest_similarity = max(match[0] for match in valid_matches)
+        for match in valid_matches:
+            if match[0] == highest_similarity:
+                return match
+    return None
+
+
+def random_text(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) + rng.choice(DECORATIONS)
+
+
+def random_query(rng):
+    title = random_text(rng)
+    artist = random_text(rng)
+    candidates = []
+    for i in range(rng.randint(0, 3)):
+        # 절반은 질의를 조금 바꾼 후보로 만들어 기준 근처의 점수가 나오게 한다
+        song_name = title + rng.choice(DECORATIONS) if rng.random() < 0.5 else random_text(rng)
+        artist_name = artist + rng.choice(DECORATIONS) if rng.random() < 0.5 else random_text(rng)
+        candidates.append((song_name, artist_name, str(30000000 + i)))
+    return title, artist, candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--queries', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = [random_query(rng) for _ in range(args.queries)]
+    expected = [reference_match(*query) for query in queries]
+    single = [song_matcher.find_best_match(*query) for query in queries]
+    batch = song_matcher.find_best_matches(queries)
+
+    mismatches = 0
+    for query, want, got_single, got_batch in zip(queries, expected, single, batch):
+        if got_single != want or got_batch != want:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"다름: {query}\n  기존: {want}\n  find_best_match: {got_single}\n  find_best_matches: {got_batch}")
+    matched = sum(result is not None for result in expected)
+    print(f"{len(queries)}개 질의 중 매칭 {matched}개, 결과가 다른 질의 {mismatches}개")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""TJ / 멜론 응답을 흉내 내는 로컬 HTTP 서버.
+
+newSongOfMonth JSON, song_search_list.asp, 멜론 검색/상세 페이지를 데이터셋에서 만들어 응답하며,
+응답 지연(latency)과 오류율(error_rate, 503 응답)을 설정할 수 있다.
+페이지 구조는 bench/fixtures 의 저장된 페이지와 같다.
+"""
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote_plus, urlparse
+
+TITLES = ['밤편지', '사랑', '이별', '봄날', '눈물', '너에게', 'Love', 'Dive', 'Night', '우리의 밤', '첫눈', '기억']
+ARTISTS = ['아이유', 'IVE (아이브)', '방탄소년단', 'NewJeans', '성시경', '뉴진스', '에스파 (aespa)', '임영웅', '태연', 'DAY6']
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html lang="ko">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<div id="gnb"><ul>{nav}</ul></div>
+"""
+PAGE_FOOT = """<div id="footer"><p class="copy">footer</p></div>
+</body>
+</html>
+"""
+NAV = ''.join(f'<li class="nav_item"><a href="/menu/{i}.htm">메뉴 {i}</a></li>' for i in range(150))
+
+
+def build_dataset(song_count, seed=0):
+    """(곡 번호, 제목, 아티스트, 멜론 곡 ID, MR 여부, Live 여부) 목록."""
+    rng = random.Random(seed)
+    songs = []
+    for i in range(song_count):
+        title = f"{rng.choice(TITLES)} {i}"
+        artist = ARTISTS[rng.randrange(len(ARTISTS))]
+        songs.append((str(80000 + i), title, artist, str(30000000 + i), rng.random() < 0.3, rng.random() < 0.1))
+    return songs
+
+
+class MockState:
+    def __init__(self, songs, latency=0.0, error_rate=0.0, seed=0):
+        self.songs = songs
+        self.by_number = {song[0]: song for song in songs}
+        self.by_melon_id = {song[3]: song for song in songs}
+        self.by_artist = {}
+        for song in songs:
+            self.by_artist.setdefault(song[2], []).append(song)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = Counter()
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+
+def album_id_of(melon_song_id):
+    return int(melon_song_id) // 3  # 같은 앨범에 여러 곡이 들어 있는 것처럼 보이도록
+
+
+def tj_rows_page(songs):
+    rows = []
+    for song_number, title, artist, _, is_mr, is_live in songs:
+        icons = ''
+        if is_mr:
+            icons += ' <img src="/images/tjsong/mr_icon.png" alt="MR">'
+        if is_live:
+            icons += ' <img src="/images/tjsong/live_icon.png" alt="Live">'
+        rows.append(f'<tr>\n<td>{song_number}</td>\n<td class="left">{title}{icons}</td>\n<td>{artist}</td>\n<td>작사가</td>\n<td>작곡가</td>\n</tr>')
+    return (PAGE_HEAD.format(title='TJ미디어 노래검색', nav=NAV)
+            + '<div id="BoardType1">\n<table class="board_type1">\n<tbody>\n'
+            + '<tr>\n<th>곡번호</th><th>곡제목</th><th>가수</th><th>작사</th><th>작곡</th>\n</tr>\n'
+            + '\n'.join(rows) + '\n</tbody>\n</table>\n</div>\n' + PAGE_FOOT)
+
+
+def melon_search_page(songs):
+    rows = []
+    for i, (_, title, artist, melon_song_id, _, _) in enumerate(songs):
+        rows.append(f"""<tr>
+<td class="no"><div class="wrap t_center"><span class="rank">{i + 1}</span></div></td>
+<td><div class="wrap"><input type="checkbox" class="input_check" value="{melon_song_id}"></div></td>
+<td class="t_left"><div class="wrap pd_none left"><div class="ellipsis"><a href="javascript:searchLog('web_song','SONG','SO','{title}','{melon_song_id}');melon.play.playSong('26020101',{melon_song_id});" class="fc_gray" title="{title} 재생">{title}</a></div><a href="javascript:searchLog('web_song','SONG','SO','{title}','{melon_song_id}');melon.link.goSongDetail('{melon_song_id}');" class="btn btn_icon_detail" title="{title} 상세정보 페이지 이동"><span class="odd_span">상세정보</span></a></div></td>
+<td class="t_left"><div class="wrap"><div class="ellipsis" id="artistName"><a href="javascript:melon.link.goArtistDetail('1');" class="fc_mgray">{artist}</a></div></div></td>
+<td class="t_left"><div class="wrap"><div class="ellipsis"><a href="javascript:melon.link.goAlbumDetail('{album_id_of(melon_song_id)}');" class="fc_mgray">앨범</a></div></div></td>
+</tr>""")
+    return (PAGE_HEAD.format(title='Melon 검색', nav=NAV)
+            + '<form id="frm_defaultList" name="frm" method="get">\n<div class="tb_list d_song_list songTypeOne">\n<table>\n'
+            + '<thead><tr><th>NO</th><th>선택</th><th>곡명</th><th>아티스트</th><th>앨범</th></tr></thead>\n<tbody>\n'
+            + '\n'.join(rows) + '\n</tbody>\n</table>\n</div>\n</form>\n' + PAGE_FOOT)
+
+
+def melon_detail_page(song):
+    _, title, artist, melon_song_id, _, _ = song
+    album_id = album_id_of(melon_song_id)
+    return (PAGE_HEAD.format(title=f'{title} - {artist} - Melon', nav=NAV) + f"""<form id="downloadfrm" method="get">
+<div class="section_info">
+<div class="wrap_info">
+<div class="thumb"><a href="javascript:melon.link.goAlbumDetail('{album_id}');" class="image_typeAll"><img src="https://cdnimg.melon.co.kr/cm/album/images/{album_id}_500.jpg" width="282" height="282" alt="{title} 앨범 이미지"></a></div>
+<div class="entry">
+<div class="info"><div class="song_name"><strong class="none">곡명</strong>{title}</div><div class="artist"><span>{artist}</span></div></div>
+<div class="meta">
+<dl class="list">
+<dt>앨범</dt><dd><a href="javascript:melon.link.goAlbumDetail('{album_id}');">앨범 {album_id}</a></dd>
+<dt>발매일</dt><dd>2024.05.01</dd>
+<dt>장르</dt><dd>발라드</dd>
+</dl>
+</div>
+</div>
+</div>
+</div>
+</form>
+""" + PAGE_FOOT)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    state = None  # make_server 에서 설정
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body, content_type='text/html; charset=utf-8'):
+        payload = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        with self.state.lock:
+            self.state.bytes_sent += len(payload)
+
+    def before(self, endpoint):
+        """요청 수 집계, 지연, 오류 주입. 오류를 응답했으면 True."""
+        state = self.state
+        with state.lock:
+            state.requests[endpoint] += 1
+            fail = state.rng.random() < state.error_rate
+        if state.latency:
+            time.sleep(state.latency)
+        if fail:
+            self.reply(503, 'Service Unavailable', 'text/plain')
+            return True
+        return False
+
+    def do_POST(self):
+        parsed = urlparse(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        if parsed.path != '/legacy/api/newSongOfMonth':
+            self.reply(404, 'Not Found', 'text/plain')
+            return
+        if self.before('newSongOfMonth'):
+            return
+        items = [{'pro': song[0], 'indexTitle': song[1], 'indexSong': song[2]} for song in self.state.songs]
+        body = {'resultCode': '99', 'searchYm': form.get('searchYm', [''])[0], 'resultData': {'items': items}}
+        self.reply(200, json.dumps(body, ensure_ascii=False), 'application/json; charset=utf-8')
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
+        state = self.state
+
+        if parsed.path == '/tjsong/song_search_list.asp':
+            if self.before('tj_search'):
+                return
+            text = query.get('strText', '')
+            if query.get('strType') == '2':
+                songs = state.by_artist.get(text, [])
+            else:
+                songs = [state.by_number[text]] if text in state.by_number else []
+            self.reply(200, tj_rows_page(songs))
+
+        elif parsed.path == '/search/song/index.htm':
+            if self.before('melon_search'):
+                return
+            # 'q=제목+아티스트' 에서 제목이 일치하는 곡과 다른 곡 2개를 결과로 반환
+            keyword = unquote_plus(parsed.query.split('q=', 1)[-1])
+            matches = [song for song in state.songs if song[1] and keyword.startswith(song[1])]
+            decoys = [song for song in state.songs[:3] if song not in matches]
+            self.reply(200, melon_search_page((matches + decoys)[:3]))
+
+        elif parsed.path == '/song/detail.htm':
+            if self.before('melon_detail'):
+                return
+            song = state.by_melon_id.get(query.get('songId', ''))
+            if song is None:
+                self.reply(404, 'Not Found', 'text/plain')
+                return
+            self.reply(200, melon_detail_page(song))
+
+        else:
+            self.reply(404, 'Not Found', 'text/plain')
+
+
+def make_server(state, host='127.0.0.1', port=0):
+    """state 를 사용하는 서버를 생성하고 백그라운드 스레드에서 실행. (server, base_url) 을 반환."""
+    handler = type('BoundMockHandler', (MockHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
@@ -0,0 +1,69 @@
+"""저장된 TJ / 멜론 페이지로 파서 백엔드별 파싱 시간을 비교하는 마이크로 벤치마크.
+
+    python bench/parser_bench.py [-n 반복 횟수] [--fixtures 디렉터리]
+
+fixtures 디렉터리의 파일 이름 접두사로 페이지 종류를 구분한다.
+(tj_search*.html, melon_search*.html, melon_detail*.html)
+실제 페이지를 같은 이름 규칙으로 저장해 두면 함께 측정된다.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from html_parser import BeautifulSoupParser, create_parser, lxml_html  # noqa: E402
+
+PAGE_TYPES = {
+    'tj_search': 'parse_tj_rows',
+    'melon_search': 'parse_melon_search',
+    'melon_detail': 'parse_melon_detail',
+}
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for file_name in sorted(os.listdir(directory)):
+        for prefix, method in PAGE_TYPES.items():
+            if file_name.startswith(prefix) and file_name.endswith('.html'):
+                with open(os.path.join(directory, file_name), encoding='utf-8') as f:
+                    fixtures.append((file_name, method, f.read()))
+    return fixtures
+
+
+def measure(parser, method, html, iterations):
+    parse = getattr(parser, method)
+    result = parse(html)
+    started_at = time.perf_counter()
+    for _ in range(iterations):
+        parse(html)
+    return (time.perf_counter() - started_at) / iterations * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--iterations', type=int, default=200)
+    parser.add_argument('--fixtures', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures'))
+    args = parser.parse_args()
+
+    backends = [BeautifulSoupParser()]
+    if lxml_html is not None:
+        backends.append(create_parser('lxml'))
+    else:
+        print("lxml 이 설치되어 있지 않아 BeautifulSoup 만 측정합니다.")
+
+    print(f"{'page':<28}{'size':>9}" + ''.join(f"{backend.name + ' ms':>12}" for backend in backends) + f"{'same':>7}")
+    for file_name, method, html in load_fixtures(args.fixtures):
+        timings = []
+        results = []
+        for backend in backends:
+            elapsed, result = measure(backend, method, html, args.iterations)
+            timings.append(elapsed)
+            results.append(result)
+        same = all(result == results[0] for result in results)
+        print(f"{file_name:<28}{len(html.encode('utf-8')):>9}" + ''.join(f"{t:>12.3f}" for t in timings) + f"{str(same):>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""벤치마크용 MySQL 대체 DB. sqlite3 연결을 pymysql(DictCursor) 처럼 보이게 감싸고 왕복 횟수를 센다."""
+import sqlite3
+import threading
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS song_info (
+        song_number TEXT PRIMARY KEY,
+        song_name TEXT NOT NULL,
+        artist_name TEXT NOT NULL,
+        is_mr INTEGER,
+        is_live INTEGER,
+        song_name_chosung TEXT,
+        artist_name_chosung TEXT,
+        melon_song_id TEXT,
+        genre TEXT,
+        year INTEGER,
+        album TEXT
+    )
+"""
+
+
+def translate(query):
+    """MySQL 문법 중 크롤러가 쓰는 부분만 sqlite 문법으로 변환."""
+    return query.replace('%s', '?').replace('INSERT IGNORE', 'INSERT OR IGNORE')
+
+
+class SqliteCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.db.cursor()
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def execute(self, query, params=()):
+        self.connection.count()
+        with self.connection.lock:
+            self.cursor.execute(translate(query), tuple(params or ()))
+        self.rowcount = self.cursor.rowcount
+        return self.rowcount
+
+    def executemany(self, query, rows):
+        self.connection.count()
+        with self.connection.lock:
+            self.cursor.executemany(translate(query), [tuple(row) for row in rows])
+        self.rowcount = self.cursor.rowcount
+        return self.rowcount
+
+    def fetchall(self):
+        columns = [column[0] for column in self.cursor.description or ()]
+        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+    def fetchone(self):
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in self.cursor.description], row))
+
+    def close(self):
+        self.cursor.close()
+
+
+class SqliteConnection:
+    def __init__(self, db, stats):
+        self.db = db
+        self.stats = stats
+        self.lock = stats.lock
+
+    def count(self):
+        with self.stats.counter_lock:
+            self.stats.round_trips += 1
+
+    def cursor(self):
+        return SqliteCursor(self)
+
+    def commit(self):
+        self.count()
+        with self.lock:
+            self.db.commit()
+
+    def rollback(self):
+        # 모든 연결이 sqlite 연결 하나를 공유하므로, 연결 풀이 반납할 때마다 호출하는 rollback 으로
+        # 다른 연결이 아직 commit 하지 않은 쓰기를 되돌리지 않도록 왕복 횟수만 센다.
+        self.count()
+
+    def ping(self, reconnect=True):
+        self.count()
+
+    def close(self):
+        with self.stats.counter_lock:
+            self.stats.closed += 1
+
+
+class SqliteDatabase:
+    """모든 연결이 하나의 sqlite 파일(기본값: 메모리)을 공유하는 DB. connect() 가 pymysql.connect 를 대신한다."""
+
+    def __init__(self, path=':memory:'):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(SCHEMA)
+        self.db.commit()
+        self.lock = threading.RLock()
+        self.counter_lock = threading.Lock()
+        self.round_trips = 0
+        self.connections = 0
+        self.closed = 0
+
+    def connect(self):
+        with self.counter_lock:
+            self.connections += 1
+        return SqliteConnection(self.db, self)
+
+    def seed(self, songs):
+        """이미 DB 에 있는 곡을 미리 넣어 둔다 (song_number, song_name, artist_name)."""
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO song_info (song_number, song_name, artist_name) VALUES (?, ?, ?)", songs
+            )
+            self.db.commit()
+
+    def count_rows(self, where='1 = 1'):
+        with self.lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM song_info WHERE {where}").fetchone()[0]
+
+    def column_values(self, column):
+        """{곡 번호: column 값} (NULL 포함)."""
+        with self.lock:
+            return dict(self.db.execute(f"SELECT song_number, {column} FROM song_info").fetchall())
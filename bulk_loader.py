@@ -0,0 +1,92 @@
+import logging
+
+from db_writer import BulkUpdater
+from output_sink import SONG_FIELDS, export_files, read_records, update_values
+
+logger = logging.getLogger(__name__)
+
+
+class BulkLoader:
+    """FileSink 로 내보낸 파일을 song_info 에 적재.
+
+    - songs: INSERT IGNORE 를 batch_size 행씩 묶어 실행. load_data 이고 CSV 파일이면 LOAD DATA LOCAL INFILE 사용
+    - updates: 파일 순서대로 곡별 컬럼 값을 합친 뒤(나중 값 우선) BulkUpdater 로 batch_size 곡씩 UPDATE ... CASE
+    - 같은 파일을 다시 적재해도 결과가 같다
+    """
+
+    def __init__(self, service, batch_size=1000, load_data=False):
+        self.service = service
+        self.batch_size = batch_size
+        self.load_data = load_data
+
+    def load(self, directory):
+        songs = self.load_songs(directory)
+        updates = self.load_updates(directory)
+        logger.info(f"{directory} 적재 완료: 곡 {songs}개 추가, {updates}개 곡 업데이트")
+        return songs, updates
+
+    def load_songs(self, directory):
+        inserted = 0
+        for path in export_files(directory, 'songs'):
+            if self.load_data and path.endswith('.csv'):
+                inserted += self.load_data_infile(path)
+            else:
+                inserted += self.insert_batches(read_records(path))
+            logger.info(f"{path} 적재 완료")
+        return inserted
+
+    def insert_batches(self, records):
+        query = "INSERT IGNORE INTO song_info ({}) VALUES ({})".format(
+            ', '.join(SONG_FIELDS), ', '.join(['%s'] * len(SONG_FIELDS)))
+        inserted = 0
+        batch = []
+        with self.service.db_pool.connection() as connection:
+            for record in records:
+                batch.append(tuple(record[field] for field in SONG_FIELDS))
+                if len(batch) >= self.batch_size:
+                    inserted += self.execute_batch(connection, query, batch)
+                    batch = []
+            if batch:
+                inserted += self.execute_batch(connection, query, batch)
+        return inserted
+
+    def execute_batch(self, connection, query, batch):
+        with connection.cursor() as cursor:
+            with self.service.db_timer('load_songs'):
+                inserted = cursor.executemany(query, batch) or 0
+        with self.service.db_timer('commit'):
+            connection.commit()
+        return inserted
+
+    def load_data_infile(self, path):
+        """CsvWriter 가 쓴 파일(헤더, NULL 은 \\N, 백슬래시 이스케이프)을 LOAD DATA LOCAL INFILE 로 적재."""
+        query = """
+            LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE song_info CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY '\\\\'
+            LINES TERMINATED BY '\\n' IGNORE 1 LINES ({})
+        """.format(', '.join(SONG_FIELDS))
+        # LOAD DATA LOCAL 은 연결 옵션이 필요하므로 풀과 별도의 연결을 사용
+        connection = self.service.setup_db_config(local_infile=True)
+        try:
+            with connection.cursor() as cursor:
+                with self.service.db_timer('load_data'):
+                    inserted = cursor.execute(query, (path,)) or 0
+            connection.commit()
+        finally:
+            connection.close()
+        return inserted
+
+    def load_updates(self, directory):
+        rows = {}
+        for path in export_files(directory, 'updates'):
+            for record in read_records(path):
+                rows.setdefault(str(record['song_number']), {}).update(update_values(record))
+
+        with self.service.db_pool.connection() as connection:
+            updater = BulkUpdater(connection, flush_size=self.batch_size, flush_interval=float('inf'),
+                                  metrics=self.service.metrics)
+            for key, values in rows.items():
+                if values:
+                    updater.add(key, values)
+            updater.flush()
+        return len(rows)
@@ -0,0 +1,87 @@
+import re
+
+try:
+    import numpy as np
+except ImportError:  # numpy 가 없으면 chosung_many 도 str.translate 로 동작
+    np = None
+
+CHOSUNG_LIST = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ',
+                'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
+
+HANGUL_START = ord('가')
+HANGUL_END = ord('힣')
+SYLLABLES_PER_CHOSUNG = 588
+
+# str.translate 용 변환표: 인덱스가 코드 포인트인 문자열로, 완성형 한글 11,172자는 초성으로, 나머지는 그대로.
+# 표보다 큰 코드 포인트는 translate 가 그대로 둔다. (dict 표보다 조회가 빠름)
+TRANSLATE_TABLE = ''.join(
+    CHOSUNG_LIST[(code - HANGUL_START) // SYLLABLES_PER_CHOSUNG] if code >= HANGUL_START else chr(code)
+    for code in range(HANGUL_END + 1)
+)
+
+NON_SYLLABLE_PATTERN = re.compile('[^가-힣]+')
+NON_ALNUM_PATTERN = re.compile(r'[\W_]+')
+
+KEEP_MODES = ('none', 'all', 'alnum')
+
+# chosung_many 에서 여러 문자열을 이어 붙일 때 쓰는 구분자
+SEPARATOR = '\x00'
+NON_SYLLABLE_OR_SEPARATOR_PATTERN = re.compile('[^가-힣\x00]+')
+NON_ALNUM_OR_SEPARATOR_PATTERN = re.compile(r'(?:[^\w\x00]|_)+')
+
+if np is not None:
+    CHOSUNG_CODES = np.array([ord(c) for c in CHOSUNG_LIST], dtype=np.uint32)
+
+
+def get_chosung(text, keep='none'):
+    """완성형 한글을 초성으로 바꾼 문자열. keep 은 한글이 아닌 문자 처리 방식.
+
+    - 'none': 버림 (기존 TJCrawlingService.get_chosung 과 같음)
+    - 'all': 그대로 둠
+    - 'alnum': 영문/숫자 등 글자는 두고 공백과 문장 부호는 버림
+    """
+    if keep == 'none':
+        return NON_SYLLABLE_PATTERN.sub('', text).translate(TRANSLATE_TABLE)
+    if keep == 'all':
+        return text.translate(TRANSLATE_TABLE)
+    if keep == 'alnum':
+        return NON_ALNUM_PATTERN.sub('', text).translate(TRANSLATE_TABLE)
+    raise ValueError(f"keep 은 {KEEP_MODES} 중 하나여야 합니다: {keep}")
+
+
+def _chosung_codes(joined, keep):
+    """이어 붙인 문자열을 코드 포인트 배열로 바꿔 한 번에 초성으로 변환 (numpy)."""
+    codes = np.frombuffer(joined.encode('utf-32-le'), dtype=np.uint32)
+    syllables = (codes >= HANGUL_START) & (codes <= HANGUL_END)
+    if keep == 'none':
+        codes = codes[syllables | (codes == 0)]
+        syllables = codes != 0
+    else:
+        codes = codes.copy()
+    codes[syllables] = CHOSUNG_CODES[(codes[syllables] - HANGUL_START) // SYLLABLES_PER_CHOSUNG]
+    return codes.tobytes().decode('utf-32-le')
+
+
+def chosung_many(texts, keep='none'):
+    """문자열 목록의 초성 목록. 구분자로 이어 붙여 한 번에 변환하므로 문자열마다 호출하는 것보다 빠르다.
+    numpy 가 있으면 코드 포인트 배열 연산으로 변환한다."""
+    texts = list(texts)
+    if keep not in KEEP_MODES:
+        raise ValueError(f"keep 은 {KEEP_MODES} 중 하나여야 합니다: {keep}")
+    if not texts or any(SEPARATOR in text for text in texts):
+        return [get_chosung(text, keep) for text in texts]
+
+    joined = SEPARATOR.join(texts)
+    if np is not None and keep != 'alnum':
+        try:
+            return _chosung_codes(joined, keep).split(SEPARATOR)
+        except UnicodeEncodeError:  # 짝이 없는 surrogate 등 utf-32 로 바꿀 수 없는 문자
+            pass
+
+    if keep == 'alnum':
+        result = NON_ALNUM_OR_SEPARATOR_PATTERN.sub('', joined).translate(TRANSLATE_TABLE)
+    elif keep == 'none':
+        result = NON_SYLLABLE_OR_SEPARATOR_PATTERN.sub('', joined).translate(TRANSLATE_TABLE)
+    else:
+        result = joined.translate(TRANSLATE_TABLE)
+    return result.split(SEPARATOR)
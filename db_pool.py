@@ -0,0 +1,108 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """connect() 로 만든 DB 연결을 최대 size 개까지 재사용하는 연결 풀.
+
+    - 꺼낼 때 ping(reconnect=True) 으로 상태를 확인하고, wait_timeout 등으로 끊긴 연결은 다시 연결한다
+    - 다시 연결할 수 없는 연결은 버리고 새로 만든다
+    - 돌려받을 때 rollback 으로 트랜잭션(읽기 스냅샷 포함)을 끝내서 다음 사용자가 최신 데이터를 보게 한다
+    - 연결은 한 번에 한 스레드만 사용한다 (pymysql 연결은 스레드 간 공유할 수 없음)
+    - 모든 연결이 사용 중이면 acquire_timeout 초 동안 기다린 뒤 예외를 발생시킨다
+    - min_size 는 호출하는 쪽이 동시에 붙잡는 연결 수. size 가 그보다 작으면 실행 도중 기다리다 실패하므로 처음부터 거부한다
+    """
+
+    def __init__(self, connect, size=4, acquire_timeout=60.0, metrics=None, min_size=1):
+        if size < min_size:
+            raise ValueError(f"DB 연결 풀 크기는 {min_size} 이상이어야 합니다 (현재 {size}).")
+        self.connect = connect
+        self.size = size
+        self.acquire_timeout = acquire_timeout
+        self.metrics = metrics
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def _new_connection(self):
+        with self.lock:
+            if self.created >= self.size:
+                return None
+            self.created += 1
+        try:
+            return self.connect()
+        except Exception:
+            with self.lock:
+                self.created -= 1
+            raise
+
+    def _discard(self, connection):
+        with self.lock:
+            self.created -= 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _healthy(self, connection):
+        try:
+            connection.ping(reconnect=True)
+            return True
+        except Exception as e:
+            logger.warning(f"DB 연결 확인 실패, 새 연결로 교체합니다: {e}")
+            if self.metrics is not None:
+                self.metrics.inc('db_pool_reconnects_total')
+            return False
+
+    def acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                connection = self._new_connection()
+                if connection is not None:
+                    return connection
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{self.acquire_timeout}초 안에 DB 연결을 얻지 못했습니다 (풀 크기 {self.size}).")
+                try:
+                    connection = self.idle.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+            if self._healthy(connection):
+                return connection
+            self._discard(connection)
+
+    def release(self, connection, broken=False):
+        if not broken:
+            try:
+                connection.rollback()
+            except Exception:
+                broken = True
+        if broken:
+            self._discard(connection)
+        else:
+            self.idle.put(connection)
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as connection: 형태로 연결을 빌렸다가 돌려준다. 블록에서 commit 하지 않은 변경은 반납할 때 rollback 된다."""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        while True:
+            try:
+                connection = self.idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(connection)
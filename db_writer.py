@@ -0,0 +1,93 @@
+import logging
+import threading
+import time
+from contextlib import nullcontext
+
+logger = logging.getLogger(__name__)
+
+
+class BulkUpdater:
+    """song_info 업데이트를 모아두었다가 UPDATE ... CASE 한 문장과 한 번의 commit 으로 반영.
+
+    flush_size 개가 쌓이거나 마지막 flush 후 flush_interval 초가 지나면 자동으로 flush 한다.
+    같은 키에 대한 업데이트가 여러 번 들어오면 컬럼 단위로 나중 값이 우선한다.
+    on_flush 가 주어지면 commit 이 끝난 뒤 반영된 키 목록으로 호출한다.
+    metrics 가 주어지면 UPDATE / commit 실행 시간을 db_statement_duration_seconds 에 기록한다.
+    연결을 마지막으로 쓴 뒤 ping_interval 초가 지났으면 flush 전에 ping(reconnect=True) 으로
+    MySQL wait_timeout 등으로 끊긴 연결을 다시 연결한다.
+    """
+
+    def __init__(self, connection, table='song_info', key_column='song_number',
+                 flush_size=100, flush_interval=30.0, on_flush=None, metrics=None, ping_interval=60.0):
+        self.connection = connection
+        self.table = table
+        self.key_column = key_column
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+        self.metrics = metrics
+        self.ping_interval = ping_interval
+        self.pending = {}
+        self.last_flush_at = self.last_used_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    def add(self, key, values):
+        """key 행의 컬럼들을 values(dict) 로 업데이트하도록 예약."""
+        with self.lock:
+            self.pending.setdefault(key, {}).update(values)
+            if (len(self.pending) >= self.flush_size
+                    or time.monotonic() - self.last_flush_at >= self.flush_interval):
+                self.flush()
+
+    def build_statements(self, rows):
+        """같은 컬럼 조합끼리 묶어 (query, params) 목록을 생성."""
+        groups = {}
+        for key, values in rows.items():
+            groups.setdefault(tuple(sorted(values)), []).append((key, values))
+
+        statements = []
+        for columns, items in groups.items():
+            params = []
+            set_clauses = []
+            for column in columns:
+                cases = ' '.join(['WHEN %s THEN %s'] * len(items))
+                set_clauses.append(f"{column} = CASE {self.key_column} {cases} ELSE {column} END")
+                for key, values in items:
+                    params.extend((key, values[column]))
+            params.extend(key for key, _ in items)
+            query = "UPDATE {} SET {} WHERE {} IN ({})".format(
+                self.table, ', '.join(set_clauses), self.key_column, ','.join(['%s'] * len(items))
+            )
+            statements.append((query, params))
+        return statements
+
+    def timer(self, statement):
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.timer('db_statement_duration_seconds', statement=statement)
+
+    def flush(self):
+        """쌓인 업데이트를 반영하고 commit. 실패하면 rollback 후 예외를 다시 발생시킨다."""
+        with self.lock:
+            self.last_flush_at = time.monotonic()
+            if not self.pending:
+                return 0
+            rows, self.pending = self.pending, {}
+            try:
+                if self.ping_interval is not None and self.last_flush_at - self.last_used_at >= self.ping_interval:
+                    self.connection.ping(reconnect=True)
+                self.last_used_at = self.last_flush_at
+                with self.connection.cursor() as cursor:
+                    for query, params in self.build_statements(rows):
+                        with self.timer('bulk_update'):
+                            cursor.execute(query, params)
+                with self.timer('commit'):
+                    self.connection.commit()
+                logger.info(f"{len(rows)}개 곡 정보를 일괄 업데이트했습니다.")
+            except Exception as e:
+                logger.error(f"일괄 업데이트 중 오류 발생 ({list(rows)}): {e}")
+                self.connection.rollback()
+                raise
+            if self.on_flush is not None:
+                self.on_flush(list(rows))
+            return len(rows)
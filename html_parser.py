@@ -0,0 +1,170 @@
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # lxml 이 없으면 BeautifulSoup 으로만 동작
+    lxml_html = None
+
+MR_ICON = '/images/tjsong/mr_icon.png'
+LIVE_ICON = '/images/tjsong/live_icon.png'
+MELON_SONG_ID_PATTERN = re.compile(r"searchLog\('web_song','SONG','SO','([^']+)','(\d+)'\);")
+MELON_ALBUM_ID_PATTERN = re.compile(r"goAlbumDetail\('(\d+)'\)")
+
+
+def melon_album_id(href):
+    """javascript:melon.link.goAlbumDetail('10123'); 에서 앨범 ID 를 추출. 없으면 None."""
+    match = MELON_ALBUM_ID_PATTERN.search(href or '')
+    return match.group(1) if match else None
+
+
+class BeautifulSoupParser:
+    """html.parser 기반 파서. 필요한 영역(id)만 SoupStrainer 로 골라 파싱한다."""
+
+    name = 'bs4'
+
+    def parse_tj_rows(self, html):
+        """TJ 검색 결과의 모든 행에서 {곡 번호: (MR 여부, Live 여부)}를 추출."""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(id='BoardType1'))
+        flags = {}
+        for row in soup.select("#BoardType1 > table > tbody > tr"):
+            number_cell = row.select_one("td:nth-child(1)")
+            if not number_cell:
+                continue  # 헤더 행
+            song_number = number_cell.text.strip()
+            if not song_number.isdigit():
+                continue
+            is_mr = row.find('img', {'src': MR_ICON}) is not None
+            is_live = row.find('img', {'src': LIVE_ICON}) is not None
+            flags[song_number] = (is_mr, is_live)
+        return flags
+
+    def parse_melon_search(self, html, limit=3, with_album=False):
+        """멜론 검색 결과 상위 limit 개의 (곡 이름, 아티스트 이름, 곡 ID)를 추출. 이름이 없는 행은 제외.
+        with_album 이면 앨범 ID 를 더한 (곡 이름, 아티스트 이름, 곡 ID, 앨범 ID)를 반환."""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(id='frm_defaultList'))
+        results = []
+        for row in soup.select('#frm_defaultList > div > table > tbody > tr')[:limit]:
+            song_name_tag = row.select_one('td:nth-of-type(3) a.fc_gray')
+            song_name = song_name_tag.text.strip() if song_name_tag else None
+
+            song_id = None
+            link_element = row.select_one('td:nth-of-type(3) a.btn_icon_detail')
+            if link_element:
+                match = MELON_SONG_ID_PATTERN.search(link_element.get('href', ''))
+                if match:
+                    song_id = match.group(2)
+
+            artist_name_tag = row.select_one('td:nth-of-type(4) div > div')
+            artist_name = artist_name_tag.text.strip() if artist_name_tag else None
+
+            if song_name and artist_name:
+                if with_album:
+                    album_link = row.select_one('td:nth-of-type(5) a')
+                    results.append((song_name, artist_name, song_id, melon_album_id(album_link.get('href') if album_link else None)))
+                else:
+                    results.append((song_name, artist_name, song_id))
+        return results
+
+    def parse_melon_detail(self, html, with_album=False):
+        """멜론 곡 상세 페이지에서 (장르, 발매일 문자열, 앨범 이미지 URL)을 추출. 요소가 없으면 예외 발생.
+        with_album 이면 앨범 ID(없으면 None)를 더한 4개 값을 반환."""
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(id='downloadfrm'))
+        genre_tag = soup.select_one('dt:-soup-contains("장르") + dd')
+        if genre_tag is None:
+            # 장르 정보가 downloadfrm 밖에 있는 페이지는 전체를 파싱
+            soup = BeautifulSoup(html, 'html.parser')
+            genre_tag = soup.select_one('dt:-soup-contains("장르") + dd')
+        genre = genre_tag.text.strip()
+        release_date = soup.select_one('#downloadfrm > div > div > div:nth-of-type(2) > div:nth-of-type(2) > dl > dd:nth-of-type(2)').text.strip()
+        album_link = soup.select_one('#downloadfrm > div > div > div:nth-of-type(1) > a')
+        album_image_url = album_link.select_one('img')['src']
+        if with_album:
+            return genre, release_date, album_image_url, melon_album_id(album_link.get('href'))
+        return genre, release_date, album_image_url
+
+
+class LxmlParser:
+    """lxml 기반 파서. 미리 컴파일한 XPath 로 필요한 필드만 추출한다."""
+
+    name = 'lxml'
+
+    def __init__(self):
+        self.tj_rows = etree.XPath('//*[@id="BoardType1"]/table/tbody/tr')
+        self.tj_number = etree.XPath('td[1]')
+        self.tj_mr = etree.XPath(f'.//img[@src="{MR_ICON}"]')
+        self.tj_live = etree.XPath(f'.//img[@src="{LIVE_ICON}"]')
+
+        self.melon_rows = etree.XPath('//*[@id="frm_defaultList"]/div/table/tbody/tr')
+        self.melon_song_name = etree.XPath('td[3]//a[contains(concat(" ", normalize-space(@class), " "), " fc_gray ")]')
+        self.melon_song_link = etree.XPath('td[3]//a[contains(concat(" ", normalize-space(@class), " "), " btn_icon_detail ")]/@href')
+        self.melon_artist_name = etree.XPath('td[4]//div/div')
+        self.melon_album_link = etree.XPath('td[5]//a/@href')
+
+        self.melon_genre = etree.XPath('//dt[contains(., "장르")]/following-sibling::*[1][self::dd]')
+        self.melon_release_date = etree.XPath('//*[@id="downloadfrm"]/div/div/div[2]/div[2]/dl/dd[2]')
+        self.melon_album_image = etree.XPath('//*[@id="downloadfrm"]/div/div/div[1]/a/img/@src')
+        self.melon_detail_album_link = etree.XPath('//*[@id="downloadfrm"]/div/div/div[1]/a/@href')
+
+    @staticmethod
+    def document(html):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return lxml_html.fromstring(html, parser=lxml_html.HTMLParser(encoding='utf-8'))
+
+    @staticmethod
+    def first_text(elements):
+        return elements[0].text_content().strip() if elements else None
+
+    def parse_tj_rows(self, html):
+        flags = {}
+        for row in self.tj_rows(self.document(html)):
+            song_number = self.first_text(self.tj_number(row))
+            if not song_number or not song_number.isdigit():
+                continue
+            flags[song_number] = (bool(self.tj_mr(row)), bool(self.tj_live(row)))
+        return flags
+
+    def parse_melon_search(self, html, limit=3, with_album=False):
+        results = []
+        for row in self.melon_rows(self.document(html))[:limit]:
+            song_name = self.first_text(self.melon_song_name(row))
+
+            song_id = None
+            links = self.melon_song_link(row)
+            if links:
+                match = MELON_SONG_ID_PATTERN.search(links[0])
+                if match:
+                    song_id = match.group(2)
+
+            artist_name = self.first_text(self.melon_artist_name(row))
+
+            if song_name and artist_name:
+                if with_album:
+                    album_links = self.melon_album_link(row)
+                    results.append((song_name, artist_name, song_id, melon_album_id(album_links[0] if album_links else None)))
+                else:
+                    results.append((song_name, artist_name, song_id))
+        return results
+
+    def parse_melon_detail(self, html, with_album=False):
+        document = self.document(html)
+        genre = self.first_text(self.melon_genre(document))
+        release_date = self.first_text(self.melon_release_date(document))
+        album_images = self.melon_album_image(document)
+        if genre is None or release_date is None or not album_images:
+            raise ValueError("멜론 상세 페이지에서 장르/발매일/앨범 이미지를 찾을 수 없습니다.")
+        if with_album:
+            album_links = self.melon_detail_album_link(document)
+            return genre, release_date, album_images[0], melon_album_id(album_links[0] if album_links else None)
+        return genre, release_date, album_images[0]
+
+
+def create_parser(name=None):
+    """name('lxml' / 'bs4')에 해당하는 파서를 생성. 지정하지 않으면 lxml 이 있으면 lxml 을 사용."""
+    name = name or os.getenv('HTML_PARSER') or ('lxml' if lxml_html is not None else 'bs4')
+    if name == 'lxml' and lxml_html is not None:
+        return LxmlParser()
+    return BeautifulSoupParser()
@@ -0,0 +1,206 @@
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 차단/캡차 페이지로 보이는 응답 본문 (200 으로 응답해도 속도를 줄임).
+# 정상 페이지의 스크립트에 같은 단어가 있을 수 있어 작은 응답에서만 확인한다.
+BLOCKED_PATTERN = re.compile('captcha|비정상적인 접근|자동입력 방지'.encode('utf-8'), re.IGNORECASE)
+BLOCKED_PAGE_MAX_BYTES = 32 * 1024
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기할 초로 변환. 없거나 해석할 수 없으면 None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def error_reason(error):
+    """응답 없이 실패한 요청의 속도 조절 사유 (타임아웃이면 'timeout', 그 외는 예외 이름).
+    재시도를 소진한 타임아웃은 ConnectionError(MaxRetryError) 로 감싸져 오므로 원인도 확인한다."""
+    cause = getattr(error.args[0], 'reason', None) if error.args else None
+    if isinstance(cause, urllib3.exceptions.NewConnectionError):  # urllib3 2.x 에서는 TimeoutError 의 하위 클래스
+        return type(error).__name__
+    if isinstance(error, requests.exceptions.Timeout) or isinstance(cause, urllib3.exceptions.TimeoutError):
+        return 'timeout'
+    return type(error).__name__
+
+
+def looks_blocked(response):
+    content_type = response.headers.get('Content-Type', '')
+    return ('html' in content_type and len(response.content) <= BLOCKED_PAGE_MAX_BYTES
+            and BLOCKED_PATTERN.search(response.content) is not None)
+
+
+class HttpClient:
+    """호스트별로 keep-alive 커넥션 풀을 가진 requests.Session 을 재사용하는 HTTP 클라이언트.
+
+    - 429/5xx 응답과 연결 오류는 지수 백오프로 재시도 (Retry-After 헤더 존중)
+    - 모든 요청에 (connect, read) 타임아웃 적용
+    - rate_limiter 가 주어지면 요청 전에 호스트별 토큰을 획득하고, feedback 을 지원하면 응답 결과(또는 실패 이유)를 알려 줌
+    - cache 가 주어지면 cache_ttl 을 지정한 GET 요청은 캐시를 먼저 확인 (캐시 적중 시 토큰을 쓰지 않음).
+      호출자가 본문을 해석하지 못하면 invalidate 로 항목을 지워 다음 시도에서 다시 받게 한다
+    - metrics 가 주어지면 호스트별 요청 수/상태 코드/지연/다운로드 바이트/속도 제한 대기 시간/캐시 적중을 기록
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, pool_connections=4, pool_maxsize=8, retries=3, backoff_factor=1.0,
+                 connect_timeout=5.0, read_timeout=30.0, rate_limiter=None, cache=None, metrics=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.metrics = metrics
+        self.sessions = {}
+        self.request_count = 0  # 캐시 적중을 제외한 실제 요청 수 (요청 예산 계산용)
+        self.lock = threading.Lock()
+
+    def _new_session(self):
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def session_for(self, url):
+        """url 의 호스트(scheme 포함)에 해당하는 세션을 반환. 없으면 새로 생성."""
+        parsed = urlparse(url)
+        key = f"{parsed.scheme}://{parsed.netloc}"
+        with self.lock:
+            session = self.sessions.get(key)
+            if session is None:
+                session = self._new_session()
+                self.sessions[key] = session
+            return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).netloc
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire(url)
+            if self.metrics is not None and waited:
+                self.metrics.inc('throttle_wait_seconds_total', waited, host=host)
+
+        with self.lock:
+            self.request_count += 1
+        started_at = time.perf_counter()
+        try:
+            response = self.session_for(url).request(method, url, **kwargs)
+        except Exception as e:
+            if self.metrics is not None:
+                self.metrics.inc('http_requests_total', host=host, method=method, status=type(e).__name__)
+            # 타임아웃/연결 오류(재시도 소진 포함)는 가장 강한 과부하 신호이므로 속도를 줄인다
+            if hasattr(self.rate_limiter, 'feedback'):
+                self.rate_limiter.feedback(url, None, time.perf_counter() - started_at, error=error_reason(e))
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            if self.metrics is not None:
+                self.metrics.observe('http_request_duration_seconds', elapsed, host=host, method=method)
+
+        # urllib3 가 내부에서 재시도한 횟수
+        retries = getattr(response.raw, 'retries', None)
+        retried = len(retries.history) if retries is not None and retries.history else 0
+        if self.metrics is not None:
+            self.metrics.inc('http_requests_total', host=host, method=method, status=response.status_code)
+            self.metrics.inc('http_response_bytes_total', len(response.content), host=host)
+            if retried:
+                self.metrics.inc('http_retries_total', retried, host=host)
+        if hasattr(self.rate_limiter, 'feedback'):
+            self.rate_limiter.feedback(
+                url, response.status_code, elapsed,
+                retry_after=parse_retry_after(response.headers.get('Retry-After')),
+                retried=bool(retried),
+                blocked=looks_blocked(response),
+            )
+        return response
+
+    def _count_cache(self, url, result):
+        if self.metrics is not None:
+            self.metrics.inc('http_cache_total', host=urlparse(url).netloc, result=result)
+
+    @staticmethod
+    def full_url(url, params=None):
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def invalidate(self, url, params=None):
+        """get 으로 캐시된 url 의 응답을 삭제 (해석에 실패한 페이지를 재시도 때 다시 받도록)."""
+        if self.cache is None:
+            return
+        full_url = self.full_url(url, params)
+        self.cache.delete(self.cache.make_key('GET', full_url))
+        self._count_cache(full_url, 'invalidated')
+
+    def get(self, url, cache_ttl=None, **kwargs):
+        """cache_ttl(초)을 지정하면 캐시된 응답이 그 시간 안에 수집된 경우 네트워크 요청 없이 반환."""
+        if self.cache is None or cache_ttl is None:
+            return self.request('GET', url, **kwargs)
+
+        full_url = self.full_url(url, kwargs.pop('params', None))
+        key = self.cache.make_key('GET', full_url)
+        entry = self.cache.get(key)
+        if entry is not None:
+            cached_url, status, headers, body, fetched_at = entry
+            if time.time() - fetched_at < cache_ttl:
+                self._count_cache(full_url, 'hit')
+                return self.cache.to_response(cached_url, status, headers, body)
+
+            # 만료된 항목은 서버가 지원하면 조건부 요청으로 재검증
+            conditional = dict(kwargs.pop('headers', None) or {})
+            if 'ETag' in headers:
+                conditional['If-None-Match'] = headers['ETag']
+            if 'Last-Modified' in headers:
+                conditional['If-Modified-Since'] = headers['Last-Modified']
+            kwargs['headers'] = conditional
+
+        response = self.request('GET', full_url, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self._count_cache(full_url, 'revalidated')
+            self.cache.touch(key)
+            return self.cache.to_response(cached_url, status, headers, body)
+        self._count_cache(full_url, 'miss')
+        if response.status_code == 200 and not looks_blocked(response):
+            # 차단/캡차 페이지는 캐시하지 않는다 (TTL 동안 같은 페이지를 받게 되므로)
+            self.cache.put(key, full_url, response)
+        return response
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        with self.lock:
+            for session in self.sessions.values():
+                session.close()
+            self.sessions.clear()
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import song_matcher
+from state_db import open_state_db
+
+
+def title_grams(text):
+    """공백을 제거한 문자열의 2-gram 집합 (한 글자면 그 글자)."""
+    text = text.replace(" ", "")
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class MelonIndex:
+    """지금까지 본 멜론 검색 결과를 sqlite 파일에 모아두고, 네트워크 없이 곡을 매칭하는 로컬 색인.
+
+    - 곡 제목의 2-gram 과 초성 문자열을 posting 으로 저장
+    - 조회 시 posting 이 많이 겹치는 곡을 후보로 뽑고, 정규화한 제목이 정확히 같은 후보만 song_matcher 로 점수를 매김
+      (같은 아티스트의 비슷한 제목, 예: Butter / Butterfly, Spring Day / Spring Day 2 를 같은 곡으로 보지 않도록)
+    - 라이브 검색보다 후보가 넓으므로 평균 유사도가 min_similarity 이상일 때만 매칭으로 인정
+    """
+
+    def __init__(self, path, chosung, min_similarity=0.8, max_candidates=20):
+        self.path = path
+        self.chosung = chosung
+        self.min_similarity = min_similarity
+        self.max_candidates = max_candidates
+        self.lock = threading.Lock()
+        self.db = open_state_db(path, shared=True)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS melon_songs (
+                song_id TEXT PRIMARY KEY,
+                song_name TEXT NOT NULL,
+                artist_name TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            )
+        """)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS melon_postings (
+                gram TEXT NOT NULL,
+                song_id TEXT NOT NULL,
+                PRIMARY KEY (gram, song_id)
+            )
+        """)
+        self.db.commit()
+
+    def postings(self, song_name):
+        normalized = song_matcher.normalize_candidate(song_name)
+        grams = {f"g:{gram}" for gram in title_grams(normalized)}
+        chosung = self.chosung(normalized)
+        if chosung:
+            grams.add(f"c:{chosung}")
+        return grams
+
+    def add(self, results):
+        """results: 멜론 검색 결과 (곡 이름, 아티스트 이름, 곡 ID) 목록."""
+        now = time.time()
+        rows = [(song_id, song_name, artist_name) for song_name, artist_name, song_id in results if song_id]
+        if not rows:
+            return
+        with self.lock:
+            for song_id, song_name, artist_name in rows:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO melon_songs (song_id, song_name, artist_name, seen_at) VALUES (?, ?, ?, ?)",
+                    (song_id, song_name, artist_name, now),
+                )
+                self.db.executemany(
+                    "INSERT OR IGNORE INTO melon_postings (gram, song_id) VALUES (?, ?)",
+                    [(gram, song_id) for gram in self.postings(song_name)],
+                )
+            self.db.commit()
+
+    def candidates(self, title):
+        """title 과 posting 이 많이 겹치는 순서대로 (곡 이름, 아티스트 이름, 곡 ID) 후보를 반환."""
+        normalized = song_matcher.normalize_query(title)
+        grams = {f"g:{gram}" for gram in title_grams(normalized)}
+        chosung = self.chosung(normalized)
+        if chosung:
+            grams.add(f"c:{chosung}")
+        if not grams:
+            return []
+
+        query = """
+            SELECT s.song_name, s.artist_name, s.song_id
+            FROM melon_postings p JOIN melon_songs s ON s.song_id = p.song_id
+            WHERE p.gram IN ({})
+            GROUP BY s.song_id
+            ORDER BY COUNT(*) DESC, s.seen_at DESC
+            LIMIT ?
+        """.format(','.join(['?'] * len(grams)))
+        with self.lock:
+            return self.db.execute(query, [*grams, self.max_candidates]).fetchall()
+
+    def find_match(self, title, artists):
+        """제목이 같은 색인 항목 중 artists 의 각 아티스트 이름으로 기준을 넘는 가장 유사한 결과를 반환. 없으면 None."""
+        query_title = song_matcher.normalize_query(title)
+        candidates = [candidate for candidate in self.candidates(title)
+                      if song_matcher.normalize_query(song_matcher.strip_brackets(candidate[0])) == query_title]
+        if not candidates:
+            return None
+
+        best_match = None
+        for artist in artists:
+            if not artist:
+                continue
+            match = song_matcher.find_best_match(title, artist, candidates)
+            if match and match[0] >= self.min_similarity and (best_match is None or match[0] > best_match[0]):
+                best_match = match
+        return best_match
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,193 @@
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 지연 시간 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class Metrics:
+    """실행 중 카운터, 게이지, 지연 시간 히스토그램을 모아 실행이 끝난 뒤 Prometheus textfile 또는 JSON 으로 내보낸다.
+
+    메트릭은 (이름, 라벨) 단위로 구분하며 여러 스레드에서 동시에 기록해도 된다.
+    """
+
+    def __init__(self, namespace='tjcrawl', buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """블록 실행 시간을 name 히스토그램에 기록. 예외가 나면 status="error" 로 구분한다."""
+        started_at = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started_at, status=status, **labels)
+
+    def state(self):
+        """다른 프로세스의 Metrics 에 merge 할 수 있는 (pickle 가능한) 현재 값."""
+        with self.lock:
+            return dict(self.counters), dict(self.gauges), dict(self.histograms)
+
+    def merge(self, state):
+        """state() 결과를 더함. 카운터와 히스토그램은 합치고, 게이지는 state 의 값으로 덮어쓴다."""
+        counters, gauges, histograms = state
+        with self.lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            self.gauges.update(gauges)
+            for key, other in histograms.items():
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(other.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, other.counts)]
+                histogram.count += other.count
+                histogram.sum += other.sum
+                histogram.max = max(histogram.max, other.max)
+
+    def snapshot(self):
+        """JSON 으로 직렬화할 수 있는 현재 값."""
+        with self.lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+            gauges = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self.gauges.items())
+            ]
+            histograms = [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 6),
+                    'max': round(histogram.max, 6),
+                    'buckets': {str(bound): count for bound, count in histogram.cumulative()},
+                }
+                for (name, labels), histogram in sorted(self.histograms.items())
+            ]
+        return {'namespace': self.namespace, 'generated_at': time.time(),
+                'counters': counters, 'gauges': gauges, 'histograms': histograms}
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식 (node_exporter textfile collector 용)."""
+        def format_labels(labels):
+            if not labels:
+                return ''
+            return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels) + '}'
+
+        lines = []
+        with self.lock:
+            typed = set()
+            for kind, values in (('counter', self.counters), ('gauge', self.gauges)):
+                for (name, labels), value in sorted(values.items()):
+                    full_name = f"{self.namespace}_{name}"
+                    if full_name not in typed:
+                        lines.append(f"# TYPE {full_name} {kind}")
+                        typed.add(full_name)
+                    lines.append(f"{full_name}{format_labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                full_name = f"{self.namespace}_{name}"
+                if full_name not in typed:
+                    lines.append(f"# TYPE {full_name} histogram")
+                    typed.add(full_name)
+                for bound, count in histogram.cumulative() + [(math.inf, histogram.count)]:
+                    le = '+Inf' if bound == math.inf else repr(float(bound))
+                    lines.append(f"{full_name}_bucket{format_labels(labels + (('le', le),))} {count}")
+                lines.append(f"{full_name}_sum{format_labels(labels)} {histogram.sum!r}")
+                lines.append(f"{full_name}_count{format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, fmt=None):
+        """path 에 메트릭을 기록. fmt('prometheus' / 'json')를 지정하지 않으면 확장자가 .prom 일 때 Prometheus 형식.
+        textfile collector 가 쓰는 도중의 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체한다."""
+        fmt = fmt or ('prometheus' if path.endswith('.prom') else 'json')
+        if fmt == 'prometheus':
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def timed(stage):
+    """메서드 실행 시간을 self.metrics 의 stage_duration_seconds{stage=...} 히스토그램에 기록하는 데코레이터."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer('stage_duration_seconds', stage=stage):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
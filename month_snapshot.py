@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+import unicodedata
+
+from state_db import open_state_db
+
+
+def normalize(song):
+    """(곡 번호, 제목, 아티스트) 를 비교용으로 정규화 (NFC, 앞뒤 공백 제거)."""
+    return tuple(unicodedata.normalize('NFC', str(value)).strip() for value in song[:3])
+
+
+def fingerprint(song):
+    """곡 번호를 제외한 제목/아티스트의 해시. 같은 번호의 곡 정보가 바뀌었는지 비교하는 데 사용."""
+    _, song_name, artist_name = normalize(song)
+    return hashlib.sha1(f"{song_name}\x00{artist_name}".encode('utf-8')).hexdigest()
+
+
+def digest(songs):
+    """월 목록 전체의 해시. 항목 순서와 관계없이 같은 목록이면 같은 값."""
+    lines = sorted('\x00'.join(normalize(song)) for song in songs)
+    return hashlib.sha256('\n'.join(lines).encode('utf-8')).hexdigest()
+
+
+class MonthSnapshot:
+    """TJ 월별 신곡 목록(newSongOfMonth)의 해시와 곡별 fingerprint 를 sqlite 파일에 저장.
+
+    - diff(): 지난번 기록한 목록과 같으면 None, 다르면 (새 곡 목록, 제목/아티스트가 바뀐 곡 목록)
+    - record(): 처리가 끝난 목록을 기록 (작업 큐에 등록한 뒤 호출해야 중단 시 곡을 놓치지 않는다)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = open_state_db(path)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS month_lists (
+                year_month TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                item_count INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS month_items (
+                year_month TEXT NOT NULL,
+                song_number TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (year_month, song_number)
+            );
+        """)
+        self.db.commit()
+
+    def diff(self, year_month, songs):
+        year_month = str(year_month)
+        with self.lock:
+            row = self.db.execute(
+                "SELECT digest FROM month_lists WHERE year_month = ?", (year_month,)
+            ).fetchone()
+            if row is not None and row[0] == digest(songs):
+                return None
+            fingerprints = dict(self.db.execute(
+                "SELECT song_number, fingerprint FROM month_items WHERE year_month = ?", (year_month,)
+            ).fetchall())
+
+        added = []
+        modified = []
+        for song in songs:
+            previous = fingerprints.get(normalize(song)[0])
+            if previous is None:
+                added.append(song)
+            elif previous != fingerprint(song):
+                modified.append(song)
+        return added, modified
+
+    def record(self, year_month, songs):
+        year_month = str(year_month)
+        with self.lock:
+            self.db.execute("DELETE FROM month_items WHERE year_month = ?", (year_month,))
+            self.db.executemany(
+                "INSERT OR REPLACE INTO month_items (year_month, song_number, fingerprint) VALUES (?, ?, ?)",
+                [(year_month, normalize(song)[0], fingerprint(song)) for song in songs],
+            )
+            self.db.execute(
+                "INSERT OR REPLACE INTO month_lists (year_month, digest, item_count, updated_at) VALUES (?, ?, ?, ?)",
+                (year_month, digest(songs), len(songs), time.time()),
+            )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,350 @@
+import csv
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 가 없으면 parquet 대신 jsonl 로 내보낸다 (parquet 파일은 읽을 수 없음)
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+# song_info 에 새로 넣는 행 (save_to_db)
+SONG_FIELDS = ('song_number', 'song_name', 'artist_name', 'is_mr', 'is_live', 'song_name_chosung', 'artist_name_chosung')
+# 기존 행의 일부 컬럼 업데이트 (멜론 곡 ID / 장르·발매 연도·앨범 / 이름·초성 정정). columns 는 값이 있는 컬럼 목록
+UPDATE_COLUMNS = ('melon_song_id', 'genre', 'year', 'album',
+                  'song_name', 'artist_name', 'song_name_chosung', 'artist_name_chosung')
+UPDATE_FIELDS = ('song_number', 'columns') + UPDATE_COLUMNS
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+# MySQL LOAD DATA 의 기본 NULL 표기
+CSV_NULL = '\\N'
+
+
+class JsonlWriter:
+    """한 줄에 레코드 하나씩 쓰는 파일. write 마다 flush 하므로 중단돼도 앞의 레코드는 남는다."""
+
+    def __init__(self, path, fields):
+        self.path = path
+        self.fields = fields
+        self.file = None
+
+    def write(self, records):
+        if self.file is None:
+            self.file = open(self.path, 'a', encoding='utf-8')
+        for record in records:
+            self.file.write(json.dumps(dict(zip(self.fields, record)), ensure_ascii=False) + '\n')
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class CsvWriter:
+    """헤더가 있는 CSV. MySQL LOAD DATA 기본 규칙(NULL 은 \\N, 백슬래시는 두 번)으로 값을 표기한다."""
+
+    def __init__(self, path, fields):
+        self.path = path
+        self.fields = fields
+        self.file = None
+        self.writer = None
+
+    @staticmethod
+    def encode(value):
+        if value is None:
+            return CSV_NULL
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, str):
+            return value.replace('\\', '\\\\')
+        return value
+
+    def write(self, records):
+        if self.file is None:
+            new_file = not os.path.exists(self.path)
+            self.file = open(self.path, 'a', encoding='utf-8', newline='')
+            self.writer = csv.writer(self.file, lineterminator='\n')
+            if new_file:
+                self.writer.writerow(self.fields)
+        self.writer.writerows([self.encode(value) for value in record] for record in records)
+        self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+class ParquetWriter:
+    """write 한 번마다 parquet 파일 하나(path 의 .00001.parquet ...)를 만든다.
+    parquet 파일은 다 쓰기 전까지 읽을 수 없으므로, 반영된 레코드가 중단돼도 남도록 묶음마다 파일을 닫는다."""
+
+    def __init__(self, path, fields):
+        self.root = path[:-len('.parquet')]
+        self.fields = fields
+        self.parts = 0
+
+    def write(self, records):
+        records = list(records)
+        if not records:
+            return
+        self.parts += 1
+        path = f"{self.root}.{self.parts:05d}.parquet"
+        table = pa.Table.from_pylist([dict(zip(self.fields, record)) for record in records])
+        pq.write_table(table, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+    def close(self):
+        pass
+
+
+WRITERS = {'jsonl': JsonlWriter, 'csv': CsvWriter, 'parquet': ParquetWriter}
+
+
+def read_records(path):
+    """내보낸 파일의 레코드를 dict 로 읽음 (형식은 확장자로 구분)."""
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith('.csv'):
+        with open(path, encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            fields = next(reader, None)
+            for row in reader:
+                yield {field: None if value == CSV_NULL else value.replace('\\\\', '\\')
+                       for field, value in zip(fields, row)}
+    elif path.endswith('.parquet'):
+        if pq is None:
+            raise RuntimeError(f"pyarrow 가 설치되어 있지 않아 parquet 파일을 읽을 수 없습니다: {path}")
+        yield from pq.read_table(path).to_pylist()
+
+
+def run_started_at(path):
+    """파일 이름의 실행 ID(<YYYYmmddTHHMMSS>-<pid>)에서 실행 시작 시각. 해석할 수 없으면 파일 수정 시각."""
+    try:
+        return time.mktime(time.strptime(os.path.basename(path).split('.')[1].split('-')[0], '%Y%m%dT%H%M%S'))
+    except (IndexError, ValueError):
+        return os.path.getmtime(path)
+
+
+def export_files(directory, stream, since=None):
+    """directory 의 stream('songs' / 'updates') 파일 목록. 실행 순서(파일 이름의 시각) 대로 정렬.
+    since(epoch 초)가 주어지면 그 뒤에 시작한 실행의 파일만 반환."""
+    paths = []
+    for fmt in FORMATS:
+        paths.extend(glob.glob(os.path.join(directory, f"{stream}.*.{fmt}")))
+    if since is not None:
+        paths = [path for path in paths if run_started_at(path) >= since]
+    return sorted(paths)
+
+
+def update_values(record):
+    """updates 레코드에서 columns 에 있는 컬럼만 골라 {컬럼: 값} 으로 반환. CSV 의 year 는 정수로 바꾼다."""
+    columns = record['columns']
+    if isinstance(columns, str):
+        columns = columns.split(',') if columns else []
+    values = {column: record.get(column) for column in columns}
+    if isinstance(values.get('year'), str):
+        values['year'] = int(values['year'])
+    return values
+
+
+class MySQLSink:
+    """song_info 에 바로 쓰는 기본 출력. 연결은 서비스의 연결 풀에서 빌린다."""
+
+    name = 'mysql'
+
+    def __init__(self, service):
+        self.service = service
+
+    def insert_songs(self, rows):
+        """INSERT IGNORE 로 행을 넣고 실제로 들어간 행 수를 반환."""
+        insert_query = """
+            INSERT IGNORE INTO song_info
+            (song_number, song_name, artist_name, is_mr, is_live, song_name_chosung, artist_name_chosung)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """
+        with self.service.db_pool.connection() as connection:
+            with connection.cursor() as cursor:
+                # executemany 는 INSERT ... VALUES 를 여러 행의 INSERT 문으로 묶어서 전송한다
+                with self.service.db_timer('insert_songs'):
+                    inserted_rows = cursor.executemany(insert_query, rows) or 0
+
+            with self.service.db_timer('commit'):
+                connection.commit()
+        return inserted_rows
+
+    def existing_song_numbers(self, song_numbers):
+        return {str(row['song_number']) for row in self.service.read_from_db(song_numbers)}
+
+    def melon_songs(self, songs):
+        """songs 중 melon_song_id 가 있는 곡의 {song_number, song_name, artist_name, melon_song_id} 목록."""
+        song_numbers = [song[0] for song in songs]
+        if not song_numbers:
+            return []
+        query = """
+            SELECT song_number, song_name, artist_name, melon_song_id
+            FROM song_info
+            WHERE melon_song_id IS NOT NULL
+            AND song_number IN ({})
+        """.format(','.join(['%s'] * len(song_numbers)))
+        with self.service.db_pool.connection() as connection, connection.cursor() as cursor:
+            with self.service.db_timer('select_melon_ids'):
+                cursor.execute(query, song_numbers)
+            return cursor.fetchall()
+
+    @contextmanager
+    def updates(self, on_flush=None, connection=None):
+        """BulkUpdater 를 빌려준다. 쌓인 업데이트는 호출한 쪽이 flush 해야 한다.
+        connection 이 주어지면 풀에서 따로 빌리지 않고 그 연결로 쓴다 (읽으면서 업데이트하는 경우 연결 하나로 처리)."""
+        if connection is not None:
+            yield self.service.create_bulk_updater(connection, on_flush=on_flush)
+            return
+        with self.service.db_pool.connection() as connection:
+            yield self.service.create_bulk_updater(connection, on_flush=on_flush)
+
+    def close(self):
+        pass
+
+
+class FileUpdater:
+    """BulkUpdater 와 같은 add / flush 인터페이스로 업데이트를 FileSink 의 updates 파일에 쓴다."""
+
+    def __init__(self, sink, on_flush=None, flush_size=100):
+        self.sink = sink
+        self.on_flush = on_flush
+        self.flush_size = flush_size
+        self.pending = {}
+        self.lock = threading.RLock()
+
+    def add(self, key, values):
+        with self.lock:
+            self.pending.setdefault(key, {}).update(values)
+            if len(self.pending) >= self.flush_size:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.pending:
+                return 0
+            rows, self.pending = self.pending, {}
+            self.sink.write_updates(rows)
+            if self.on_flush is not None:
+                self.on_flush(list(rows))
+            return len(rows)
+
+
+class FileSink:
+    """MySQL 대신 directory 의 파일(JSONL / CSV / Parquet)로 결과를 내보내는 출력. bulk_loader 로 나중에 적재한다.
+
+    - 실행(프로세스)마다 songs.<실행 ID>.<형식> 과 updates.<실행 ID>.<형식> 파일을 새로 만든다
+    - DB 대신 directory 에 이미 내보낸 곡을 "DB 에 있는 곡"으로 본다 (INSERT IGNORE 와 같은 동작)
+    - 멜론 상세 단계가 쓰는 멜론 곡 ID 도 내보낸 updates 에서 찾는다
+    - 실행할 때마다 이전 파일을 모두 읽지 않도록 최근 state_days 일 안에 시작한 실행의 파일만 읽는다 (None 이면 전부).
+      그보다 오래된 곡은 다시 내보낼 수 있지만 적재는 INSERT IGNORE 이므로 결과는 같다
+    """
+
+    def __init__(self, directory, fmt='jsonl', metrics=None, flush_size=100, state_days=None):
+        if fmt == 'parquet' and pa is None:
+            logger.warning("pyarrow 가 없어 parquet 대신 jsonl 로 내보냅니다.")
+            fmt = 'jsonl'
+        if fmt not in FORMATS:
+            raise ValueError(f"출력 형식은 {FORMATS} 중 하나여야 합니다: {fmt}")
+        self.name = fmt
+        self.directory = directory
+        self.metrics = metrics
+        self.flush_size = flush_size
+        self.state_days = state_days
+        os.makedirs(directory, exist_ok=True)
+        run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self.song_writer = WRITERS[fmt](os.path.join(directory, f"songs.{run_id}.{fmt}"), SONG_FIELDS)
+        self.update_writer = WRITERS[fmt](os.path.join(directory, f"updates.{run_id}.{fmt}"), UPDATE_FIELDS)
+        self.lock = threading.Lock()
+        self.known_song_numbers = None
+        self.melon_song_ids = None
+
+    def load_state(self):
+        """최근 실행에서 내보낸 곡 번호와 멜론 곡 ID 를 읽어 둔다 (처음 필요할 때 한 번)."""
+        if self.known_song_numbers is not None:
+            return
+        since = time.time() - self.state_days * 24 * 3600 if self.state_days else None
+        known = set()
+        for path in export_files(self.directory, 'songs', since):
+            known.update(str(record['song_number']) for record in read_records(path))
+        melon_song_ids = {}
+        for path in export_files(self.directory, 'updates', since):
+            for record in read_records(path):
+                values = update_values(record)
+                if 'melon_song_id' in values:
+                    melon_song_ids[str(record['song_number'])] = values['melon_song_id']
+        self.known_song_numbers = known
+        self.melon_song_ids = melon_song_ids
+
+    def record_written(self, stream, count):
+        if self.metrics is not None:
+            self.metrics.inc('export_records_total', count, stream=stream, format=self.name)
+
+    def insert_songs(self, rows):
+        with self.lock:
+            self.load_state()
+            new_rows = []
+            for row in rows:
+                if str(row[0]) not in self.known_song_numbers:
+                    self.known_song_numbers.add(str(row[0]))
+                    new_rows.append(row)
+            self.song_writer.write(new_rows)
+        self.record_written('songs', len(new_rows))
+        return len(new_rows)
+
+    def existing_song_numbers(self, song_numbers):
+        with self.lock:
+            self.load_state()
+            return {str(song_number) for song_number in song_numbers} & self.known_song_numbers
+
+    def melon_songs(self, songs):
+        with self.lock:
+            self.load_state()
+            melon_song_ids = {str(song[0]): self.melon_song_ids.get(str(song[0])) for song in songs}
+        return [
+            {'song_number': song[0], 'song_name': song[1], 'artist_name': song[2],
+             'melon_song_id': melon_song_ids[str(song[0])]}
+            for song in songs if melon_song_ids[str(song[0])]
+        ]
+
+    def write_updates(self, rows):
+        """rows: {곡 번호: {컬럼: 값}}"""
+        records = []
+        for key, values in rows.items():
+            columns = [column for column in UPDATE_COLUMNS if column in values]
+            records.append((key, ','.join(columns)) + tuple(values.get(column) for column in UPDATE_COLUMNS))
+        with self.lock:
+            self.load_state()
+            for key, values in rows.items():
+                if values.get('melon_song_id'):
+                    self.melon_song_ids[str(key)] = values['melon_song_id']
+            self.update_writer.write(records)
+        self.record_written('updates', len(records))
+
+    @contextmanager
+    def updates(self, on_flush=None, connection=None):
+        yield FileUpdater(self, on_flush=on_flush, flush_size=self.flush_size)
+
+    def close(self):
+        with self.lock:
+            self.song_writer.close()
+            self.update_writer.close()
+
+
+def create_sink(name, service, directory='export', state_days=None):
+    """name 이 mysql 이면 MySQLSink, jsonl / csv / parquet 이면 directory 에 내보내는 FileSink."""
+    if name == 'mysql':
+        return MySQLSink(service)
+    return FileSink(directory, name, metrics=service.metrics, flush_size=service.db_flush_size, state_days=state_days)
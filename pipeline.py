@@ -0,0 +1,96 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # 단계 종료 신호
+
+
+class Stage:
+    """파이프라인 한 단계.
+
+    func(item) 은 다음 단계로 넘길 결과들의 iterable 을 반환한다 (0개면 여기서 끝, 여러 개면 펼쳐서 전달).
+    on_finish 는 이 단계의 모든 worker 가 끝난 뒤 한 번 호출된다 (남은 버퍼 flush 등).
+    """
+
+    def __init__(self, name, func, workers=1, on_finish=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.on_finish = on_finish
+
+
+class StreamingPipeline:
+    """단계 사이를 크기가 제한된 큐로 연결해, 각 항목이 준비되는 즉시 다음 단계로 흘려보내는 파이프라인.
+
+    큐가 가득 차면 앞 단계가 기다리므로(backpressure) 입력 크기와 관계없이 메모리 사용량이 일정하다.
+    """
+
+    def __init__(self, stages, queue_size=100, on_error=None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.on_error = on_error
+
+    def run(self, items):
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        threads = []
+        for index, stage in enumerate(self.stages):
+            next_queue = queues[index + 1] if index + 1 < len(queues) else None
+            next_workers = self.stages[index + 1].workers if next_queue is not None else 0
+            remaining = [stage.workers]
+            lock = threading.Lock()
+            for _ in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[index], next_queue, next_workers, remaining, lock),
+                    name=f"pipeline-{stage.name}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        # 첫 단계 큐가 가득 차면 여기서 대기
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.join()
+
+    def _work(self, stage, in_queue, next_queue, next_workers, remaining, lock):
+        try:
+            while True:
+                item = in_queue.get()
+                if item is _DONE:
+                    break
+                try:
+                    for output in stage.func(item) or ():
+                        if next_queue is not None:
+                            next_queue.put(output)
+                except Exception as e:
+                    self._report_error(stage, item, e)
+        finally:
+            # 이 단계의 마지막 worker 가 끝나면(오류로 끝나도) 정리 후 다음 단계에 종료 신호 전달
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                if stage.on_finish is not None:
+                    try:
+                        stage.on_finish()
+                    except Exception as e:
+                        logger.error(f"파이프라인 {stage.name} 단계 종료 처리 중 오류 발생: {e}")
+                for _ in range(next_workers):
+                    next_queue.put(_DONE)
+
+    def _report_error(self, stage, item, error):
+        """on_error 로 실패를 알린다. on_error 가 실패해도 worker 가 멈추지 않도록 로그만 남긴다."""
+        if self.on_error is None:
+            logger.error(f"파이프라인 {stage.name} 단계 처리 중 오류 발생: {error}")
+            return
+        try:
+            self.on_error(stage.name, item, error)
+        except Exception as e:
+            logger.error(f"파이프라인 {stage.name} 단계 오류 처리(on_error) 중 오류 발생: {e} (원래 오류: {error})")
@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import quote, urlparse
+
+try:
+    import fcntl
+except ImportError:  # Windows 에서는 프로세스 간 공유 버킷을 사용할 수 없음
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """초당 rate 개의 토큰이 채워지고 최대 burst 개까지 쌓이는 토큰 버킷."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고, 대기한 시간(초)을 반환."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                else:
+                    self._refill()
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return waited
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def set_rate(self, rate):
+        with self.lock:
+            if time.monotonic() >= self.paused_until:
+                self._refill()
+            self.rate = float(rate)
+
+    def pause_until(self, until):
+        """until(time.monotonic 기준)까지 토큰을 내주지 않고, 그 뒤에도 쌓인 토큰 없이 다시 시작."""
+        with self.lock:
+            if until > self.paused_until:
+                self.paused_until = until
+                self.tokens = 0.0
+                self.updated_at = max(self.updated_at, until)
+
+
+class SharedTokenBucket:
+    """여러 프로세스가 함께 쓰는 토큰 버킷. 상태(토큰 수, 갱신 시각, 속도, 멈춤 시각)를 path 파일에 두고
+    fcntl.flock 으로 잠근 채 읽고 쓴다. 프로세스 간 비교를 위해 time.time 을 기준으로 한다.
+    TokenBucket 과 같은 acquire / set_rate / pause_until 을 제공한다.
+    """
+
+    def __init__(self, path, rate, burst=1):
+        if fcntl is None:
+            raise RuntimeError("공유 토큰 버킷은 fcntl 을 지원하는 OS 에서만 사용할 수 있습니다.")
+        self.path = path
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._state() as state:
+            if not state:
+                state.update(tokens=self.burst, updated_at=time.time(), paused_until=0.0)
+            state['rate'] = self.rate
+
+    @contextmanager
+    def _state(self):
+        """잠금을 잡은 채 상태 dict 를 넘겨주고, 블록이 끝나면 변경 내용을 기록."""
+        with open(self.path, 'a+', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                try:
+                    state = json.loads(content) if content else {}
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refill(self, state, now):
+        elapsed = max(0.0, now - state['updated_at'])
+        state['tokens'] = min(self.burst, state['tokens'] + elapsed * state['rate'])
+        state['updated_at'] = now
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고, 대기한 시간(초)을 반환."""
+        waited = 0.0
+        while True:
+            with self._state() as state:
+                now = time.time()
+                self.rate = state['rate']  # 다른 프로세스가 바꾼 속도 반영
+                if now < state['paused_until']:
+                    wait = state['paused_until'] - now
+                else:
+                    self._refill(state, now)
+                    if state['tokens'] >= 1:
+                        state['tokens'] -= 1
+                        return waited
+                    wait = (1 - state['tokens']) / state['rate']
+            time.sleep(wait)
+            waited += wait
+
+    def set_rate(self, rate):
+        with self._state() as state:
+            now = time.time()
+            if now >= state['paused_until']:
+                self._refill(state, now)
+            state['rate'] = self.rate = float(rate)
+
+    def pause_until(self, until):
+        """until(time.monotonic 기준)까지 모든 프로세스가 토큰을 얻지 못하게 함."""
+        until = time.time() + (until - time.monotonic())
+        with self._state() as state:
+            if until > state['paused_until']:
+                state['paused_until'] = until
+                state['tokens'] = 0.0
+                state['updated_at'] = max(state['updated_at'], until)
+
+
+class HostRateLimiter:
+    """호스트별 토큰 버킷을 관리. 설정되지 않은 호스트는 default_rate 를 사용.
+    shared_dir 가 주어지면 호스트별 버킷을 그 디렉터리의 파일로 여러 프로세스가 공유한다 (샤드 실행)."""
+
+    def __init__(self, rates=None, default_rate=1.0, burst=1, shared_dir=None):
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self.burst = burst
+        self.shared_dir = shared_dir
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket_for(self, host):
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                rate = self.rates.get(host, self.default_rate)
+                if self.shared_dir:
+                    path = os.path.join(self.shared_dir, quote(host, safe='') + '.bucket')
+                    bucket = SharedTokenBucket(path, rate, self.burst)
+                else:
+                    bucket = TokenBucket(rate, self.burst)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url):
+        """url 의 호스트 버킷에서 토큰을 얻을 때까지 대기."""
+        host = urlparse(url).netloc
+        return self.bucket_for(host).acquire()
+
+
+class AdaptiveRateLimiter(HostRateLimiter):
+    """서버 응답에 따라 호스트별 초당 요청 수를 조절하는 AIMD 속도 제한기.
+
+    - 200/304 응답이 slow_seconds 안에 오면 increase 만큼 속도를 올림 (max_rate 까지)
+    - 403/429/5xx, 재시도가 있었던 응답, 느린 응답, 차단 페이지, 타임아웃/연결 오류면 속도를 decrease 배로 줄임 (min_rate 까지)
+    - Retry-After 가 주어지면 그 시간 동안 해당 호스트 요청을 멈춤
+    - state_path 가 주어지면 학습한 속도를 저장해 다음 실행에서 이어서 사용
+    """
+
+    BACKOFF_STATUSES = (403, 429)
+
+    def __init__(self, rates=None, default_rate=1.0, burst=1, min_rate=0.05, max_rate=5.0,
+                 increase=0.05, decrease=0.5, slow_seconds=3.0, state_path=None, save_interval=30.0,
+                 metrics=None, shared_dir=None):
+        super().__init__(rates, default_rate, burst, shared_dir)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_seconds = slow_seconds
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self.metrics = metrics
+        self.last_decrease_at = {}
+        self.saved_at = time.monotonic()
+        self.load()
+
+    def clamp(self, rate):
+        return min(self.max_rate, max(self.min_rate, float(rate)))
+
+    def load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"속도 제한 상태 파일을 읽지 못했습니다 ({self.state_path}): {e}")
+            return
+        for host, entry in state.items():
+            self.rates[host] = self.clamp(entry['rate'])
+        logger.info(f"이전 실행에서 학습한 호스트별 속도: {self.rates}")
+
+    def save(self):
+        """학습한 호스트별 속도를 state_path 에 기록 (임시 파일에 쓴 뒤 교체)."""
+        if not self.state_path:
+            return
+        with self.lock:
+            state = {host: {'rate': rate, 'updated_at': time.time()} for host, rate in self.rates.items()}
+            self.saved_at = time.monotonic()
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.state_path}.{os.getpid()}.tmp"  # 샤드 프로세스끼리 임시 파일이 겹치지 않도록
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def backoff_reason(self, status, elapsed, retried, blocked, error=None):
+        if error:
+            return error
+        if blocked:
+            return 'blocked'
+        if status in self.BACKOFF_STATUSES or status >= 500:
+            return str(status)
+        if retried:
+            return 'retried'
+        if elapsed >= self.slow_seconds:
+            return 'slow'
+        return None
+
+    def feedback(self, url, status, elapsed, retry_after=None, retried=False, blocked=False, error=None):
+        """url 요청의 결과(상태 코드, 걸린 시간 등)로 해당 호스트의 속도를 조절.
+        응답 없이 실패한 요청(타임아웃, 연결 오류)은 status=None 과 error 에 실패 이유를 넘긴다."""
+        host = urlparse(url).netloc
+        bucket = self.bucket_for(host)
+        reason = self.backoff_reason(status, elapsed, retried, blocked, error)
+        now = time.monotonic()
+        decreased = False
+        with self.lock:
+            rate = bucket.rate
+            if reason is None:
+                rate = min(self.max_rate, rate + self.increase)
+            elif now - self.last_decrease_at.get(host, float('-inf')) >= 1 / rate:
+                # 이미 보낸 요청들이 연달아 실패해도 한 번만 줄이도록, 줄인 뒤 한 요청 간격 동안은 유지
+                rate = max(self.min_rate, rate * self.decrease)
+                self.last_decrease_at[host] = now
+                decreased = True
+            self.rates[host] = rate
+        bucket.set_rate(rate)
+
+        if decreased:
+            logger.warning(f"{host} 응답({reason})으로 요청 속도를 {rate:.3f}/s 로 낮춥니다.")
+        if retry_after:
+            bucket.pause_until(now + retry_after)
+            logger.warning(f"{host} Retry-After {retry_after:.1f}초 동안 요청을 멈춥니다.")
+        if self.metrics is not None:
+            self.metrics.set('throttle_rate', rate, host=host)
+            if reason is not None:
+                self.metrics.inc('throttle_backoff_total', host=host, reason=reason)
+        if now - self.saved_at >= self.save_interval:
+            self.save()
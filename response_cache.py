@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from state_db import open_state_db
+
+# 캐시에 보관하는 응답 헤더 (본문 해석과 조건부 재검증에 필요한 것만)
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class ResponseCache:
+    """sqlite 파일에 GET 응답 본문을 저장하는 캐시.
+
+    - 항목별 TTL 은 조회 시점에 호출자가 넘긴다 (출처마다 다른 TTL 사용)
+    - 전체 크기가 max_bytes 를 넘으면 가장 오래 조회되지 않은 항목부터 삭제 (LRU)
+    - ETag / Last-Modified 를 저장해 만료된 항목을 조건부 요청으로 재검증
+    """
+
+    def __init__(self, path, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.db = open_state_db(path, shared=True)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.db.commit()
+
+    @staticmethod
+    def make_key(method, url):
+        return hashlib.sha256(f"{method} {url}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """(url, status, headers, body, fetched_at) 를 반환. 없으면 None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, status, headers, body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        url, status, headers, body, fetched_at = row
+        return url, status, json.loads(headers), body, fetched_at
+
+    def put(self, key, url, response):
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        body = response.content
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, url, status, headers, body, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, response.status_code, json.dumps(headers), body, len(body), now, now),
+            )
+            self._evict()
+            self.db.commit()
+
+    def delete(self, key):
+        """항목을 삭제. 받은 페이지를 해석하지 못했을 때 다음 시도에서 다시 받도록 호출한다."""
+        with self.lock:
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.db.commit()
+
+    def touch(self, key):
+        """304 Not Modified 로 재검증된 항목의 수집 시각을 갱신."""
+        now = time.time()
+        with self.lock:
+            self.db.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @staticmethod
+    def to_response(url, status, headers, body):
+        """캐시 항목을 requests.Response 로 변환 (호출자는 네트워크 응답과 동일하게 사용)."""
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response.url = url
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def close(self):
+        with self.lock:
+            self.db.close()
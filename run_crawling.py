@@ -1,5 +1,81 @@
-from TJCrawlingService import TJCrawlingService
+import argparse
+import os
+
+from TJCrawlingService import TJCrawlingService, current_year_month, month_range, parse_year_month
+from bulk_loader import BulkLoader
+from sharded_runner import SHARD_KEYS, ShardedRunner
+
+
+def year_month(value):
+    """argparse 용 YYYYMM 검사."""
+    try:
+        parse_year_month(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"YYYYMM 형식의 월이어야 합니다: {value!r}")
+    return value
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TJ 신곡 크롤링")
+    parser.add_argument("--backfill", nargs=2, metavar=("START_YM", "END_YM"), type=year_month,
+                        help="YYYYMM 형식의 기간 동안의 월별 신곡 목록을 한 번에 수집")
+    parser.add_argument("--sweep", action="store_true",
+                        help="신곡 수집 대신 멜론 곡 ID / 장르·발매 연도·앨범이 비어 있는 기존 곡을 다시 보강")
+    parser.add_argument("--time-budget", type=float, default=os.getenv("SWEEP_TIME_BUDGET"),
+                        help="--sweep 에서 사용할 최대 시간(초)")
+    parser.add_argument("--request-budget", type=int, default=os.getenv("SWEEP_REQUEST_BUDGET"),
+                        help="--sweep 에서 보낼 최대 HTTP 요청 수")
+    parser.add_argument("--recompute-chosung", action="store_true",
+                        help="song_info 전체의 초성 컬럼을 현재 규칙(CHOSUNG_KEEP)으로 다시 계산")
+    parser.add_argument("--shards", type=int, default=int(os.getenv("SHARDS", "1")),
+                        help="신곡 수집/백필의 MR/Live·멜론 단계를 나눠 처리할 워커 프로세스 수")
+    parser.add_argument("--shard-key", choices=SHARD_KEYS, default=os.getenv("SHARD_KEY", "artist"),
+                        help="곡을 샤드로 나눌 기준 (해시)")
+    parser.add_argument("--output", choices=("mysql", "jsonl", "csv", "parquet"), default=os.getenv("OUTPUT_SINK", "mysql"),
+                        help="크롤링 결과를 쓸 곳. mysql 이 아니면 OUTPUT_DIR 에 파일로 내보냄")
+    parser.add_argument("--output-dir", default=os.getenv("OUTPUT_DIR", "export"),
+                        help="--output 이 파일 형식일 때 내보낼 디렉터리")
+    parser.add_argument("--load-export", metavar="DIR",
+                        help="크롤링 대신 DIR 에 내보낸 파일을 song_info 에 적재")
+    parser.add_argument("--load-data", action="store_true",
+                        help="--load-export 에서 CSV 곡 파일을 LOAD DATA LOCAL INFILE 로 적재")
+    parser.add_argument("--metrics", default=os.getenv("METRICS_PATH"),
+                        help="실행이 끝나면 메트릭을 기록할 파일 (.prom 이면 Prometheus textfile, 그 외는 JSON)")
+    args = parser.parse_args()
+    if args.backfill:
+        try:
+            month_range(*args.backfill)
+        except ValueError as e:
+            parser.error(f"--backfill: {e}")
+
+    # 샤드 워커 프로세스도 같은 출력을 쓰도록 환경 변수로 전달
+    os.environ["OUTPUT_SINK"] = args.output
+    os.environ["OUTPUT_DIR"] = args.output_dir
+
+    if args.shards > 1:
+        # 워커 프로세스들이 호스트별 속도 제한을 함께 지키도록 토큰 버킷을 파일로 공유
+        os.environ.setdefault("RATE_LIMIT_SHARED_DIR", "state/rate_limit")
+
     service = TJCrawlingService()
-    service.crawl_and_save_new_songs()
\ No newline at end of file
+    try:
+        if args.load_export:
+            BulkLoader(service, batch_size=int(os.getenv("LOAD_BATCH_SIZE", "1000")),
+                       load_data=args.load_data).load(args.load_export)
+        elif args.shards > 1 and not (args.sweep or args.recompute_chosung):
+            runner = ShardedRunner(service, args.shards, args.shard_key)
+            start_ym, end_ym = args.backfill or (current_year_month(), current_year_month())
+            for missing_songs in service.collect_missing_songs(start_ym, end_ym):
+                runner.enqueue(missing_songs)
+            runner.run()
+        elif args.backfill:
+            service.backfill(*args.backfill)
+        elif args.recompute_chosung:
+            service.recompute_chosung()
+        elif args.sweep:
+            service.sweep_incomplete(time_budget=args.time_budget, request_budget=args.request_budget)
+        else:
+            service.crawl_and_save_new_songs()
+    finally:
+        # 실패한 실행도 어디서 시간이 걸렸는지 알 수 있도록 항상 기록
+        if args.metrics:
+            service.metrics.write(args.metrics)
+        service.close()
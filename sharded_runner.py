@@ -0,0 +1,109 @@
+import logging
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from TJCrawlingService import STAGE_MR_LIVE, TJCrawlingService
+from work_queue import WorkQueue
+
+logger = logging.getLogger(__name__)
+
+SHARD_KEYS = ('artist', 'song_number')
+
+
+def shard_of(song, shard_count, key='artist'):
+    """곡 (곡 번호, 제목, 아티스트, ...) 이 속한 샤드 번호. 프로세스와 실행에 관계없이 같은 값(crc32)."""
+    value = song[2] if key == 'artist' else song[0]
+    return zlib.crc32(str(value).encode('utf-8')) % shard_count
+
+
+def shard_path(path, shard_index, shard_count):
+    """state/work_queue.sqlite → state/work_queue.shard0of4.sqlite"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard_index}of{shard_count}{ext}"
+
+
+def run_shard(shard_index, shard_count, env):
+    """워커 프로세스에서 실행. 자기 샤드의 작업 큐를 처리하고 (메트릭 상태, 오류 또는 None)을 반환."""
+    os.environ.update(env)
+    service = TJCrawlingService()
+    error = None
+    try:
+        logger.info(f"샤드 {shard_index + 1}/{shard_count} 작업을 시작합니다.")
+        service.process_work_queue()
+    except Exception as e:
+        logger.exception(f"샤드 {shard_index + 1}/{shard_count} 처리 중 오류 발생: {e}")
+        error = repr(e)
+    finally:
+        service.close()
+    return service.metrics.state(), error
+
+
+class ShardedRunner:
+    """곡을 shard_key(아티스트 또는 곡 번호)의 해시로 나눠 샤드별 작업 큐에 등록하고,
+    샤드마다 워커 프로세스(자체 DB 연결, HTTP 풀, 작업 큐)를 띄워 동시에 처리한다.
+
+    - 기본값은 아티스트 기준: 같은 아티스트의 곡이 한 샤드에 모여 TJ 아티스트 일괄 조회가 유지된다
+    - 한 곡은 한 샤드에만 등록되므로 같은 행을 여러 워커가 쓰지 않는다
+    - 호스트별 속도 제한은 RATE_LIMIT_SHARED_DIR 의 공유 토큰 버킷으로 모든 워커가 함께 지킨다
+    - 샤드 작업 큐 파일은 샤드 수별로 따로 있으므로, 중단된 작업은 같은 샤드 수로 다시 실행하면 이어서 처리된다
+    """
+
+    def __init__(self, service, shard_count, shard_key='artist'):
+        if shard_key not in SHARD_KEYS:
+            raise ValueError(f"shard_key 는 {SHARD_KEYS} 중 하나여야 합니다: {shard_key}")
+        self.service = service
+        self.shard_count = shard_count
+        self.shard_key = shard_key
+        self.queue_path = os.getenv('WORK_QUEUE_PATH', 'state/work_queue.sqlite')
+        self.queues = {}
+
+    def queue_for(self, shard_index):
+        queue = self.queues.get(shard_index)
+        if queue is None:
+            queue = WorkQueue(
+                shard_path(self.queue_path, shard_index, self.shard_count),
+                max_attempts=self.service.work_queue.max_attempts,
+                base_backoff=self.service.work_queue.base_backoff,
+            )
+            self.queues[shard_index] = queue
+        return queue
+
+    def enqueue(self, songs):
+        """곡 목록을 샤드별 작업 큐의 MR/Live 단계에 등록."""
+        shards = {}
+        for song in songs:
+            shards.setdefault(shard_of(song, self.shard_count, self.shard_key), []).append(song)
+        for shard_index, shard_songs in shards.items():
+            self.queue_for(shard_index).enqueue(STAGE_MR_LIVE, [(song[0], list(song)) for song in shard_songs])
+
+    def run(self):
+        """샤드마다 워커 프로세스를 실행하고 끝날 때까지 대기. 워커 메트릭은 service.metrics 에 합친다."""
+        for queue in self.queues.values():
+            queue.close()
+        self.queues.clear()
+
+        # 부모 프로세스의 스레드/연결을 물려받지 않도록 spawn 으로 워커를 만든다
+        context = multiprocessing.get_context('spawn')
+        errors = []
+        with ProcessPoolExecutor(max_workers=self.shard_count, mp_context=context) as executor:
+            futures = [
+                executor.submit(run_shard, shard_index, self.shard_count, {
+                    'WORK_QUEUE_PATH': shard_path(self.queue_path, shard_index, self.shard_count),
+                })
+                for shard_index in range(self.shard_count)
+            ]
+            for shard_index, future in enumerate(futures):
+                try:
+                    metrics_state, error = future.result()
+                except Exception as e:  # 워커 프로세스가 비정상 종료된 경우
+                    metrics_state, error = None, repr(e)
+                if metrics_state is not None:
+                    self.service.metrics.merge(metrics_state)
+                if error is not None:
+                    errors.append(f"샤드 {shard_index + 1}: {error}")
+
+        if errors:
+            raise RuntimeError(f"{len(errors)}개 샤드 처리 실패: {'; '.join(errors)}")
+        logger.info(f"{self.shard_count}개 샤드 처리를 완료했습니다.")
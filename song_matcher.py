@@ -0,0 +1,114 @@
+import logging
+import re
+from functools import lru_cache
+
+try:
+    from rapidfuzz import fuzz
+    from rapidfuzz.process import cpdist
+except ImportError:  # rapidfuzz 가 없으면 fuzzywuzzy 로 동작 (배치 API 는 곡 단위 반복)
+    from fuzzywuzzy import fuzz
+    cpdist = None
+
+logger = logging.getLogger(__name__)
+
+# 매칭 기준 (TJCrawlingService.find_highest_similarity_match 와 동일)
+MIN_TITLE_SIMILARITY = 0.5
+MIN_ARTIST_SIMILARITY = 0.25
+MIN_AVG_SIMILARITY = 0.5
+
+KOREAN_ONLY_PATTERN = re.compile(r'[가-힣]+')
+BRACKETS_PATTERN = re.compile(r'\(.*?\)')
+
+
+@lru_cache(maxsize=65536)
+def normalize_query(text):
+    """TJ 제목/아티스트: 앞뒤 공백 제거, 모두 한글이면 띄어쓰기 제거, 소문자화."""
+    text = text.strip()
+    without_spaces = text.replace(" ", "")
+    if KOREAN_ONLY_PATTERN.fullmatch(without_spaces):
+        text = without_spaces
+    return text.lower()
+
+
+@lru_cache(maxsize=65536)
+def strip_brackets(text):
+    """멜론 제목/아티스트: 괄호와 괄호 안의 내용 제거."""
+    return BRACKETS_PATTERN.sub('', text).strip()
+
+
+@lru_cache(maxsize=65536)
+def normalize_candidate(text):
+    return strip_brackets(text).lower().strip()
+
+
+def ratio(a, b):
+    """fuzzywuzzy.fuzz.ratio 와 같은 0~100 정수 점수."""
+    return int(round(fuzz.ratio(a, b)))
+
+
+def score(title_similarity, artist_similarity):
+    """(평균 유사도, 기준 통과 여부)"""
+    avg_similarity = (title_similarity + artist_similarity) / 2
+    passed = (title_similarity >= MIN_TITLE_SIMILARITY
+              and artist_similarity >= MIN_ARTIST_SIMILARITY
+              and avg_similarity >= MIN_AVG_SIMILARITY)
+    return avg_similarity, passed
+
+
+def pick_best(title, artist, candidates, title_scores, artist_scores):
+    """기준을 통과한 후보 중 평균 유사도가 가장 높은 첫 번째 후보를 반환."""
+    best_match = None
+    for candidate, title_score, artist_score in zip(candidates, title_scores, artist_scores):
+        result_song_name, result_artist_name, result_song_id = candidate
+        title_similarity = int(round(title_score)) / 100
+        artist_similarity = int(round(artist_score)) / 100
+        avg_similarity, passed = score(title_similarity, artist_similarity)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"TJ Title: {title}, Title: {result_song_name}, TJ Artist: {artist}, Artist: {result_artist_name}, "
+                         f"Song Name Similarity: {title_similarity}, Artist Similarity: {artist_similarity}, AVG Similarity: {avg_similarity}")
+        if passed and (best_match is None or avg_similarity > best_match[0]):
+            best_match = (avg_similarity, strip_brackets(result_song_name), strip_brackets(result_artist_name), result_song_id)
+    return best_match
+
+
+def find_best_match(title, artist, candidates):
+    """candidates: (곡 이름, 아티스트 이름, 곡 ID) 목록.
+    (평균 유사도, 곡 이름, 아티스트 이름, 곡 ID) 또는 None 을 반환."""
+    query_title = normalize_query(title)
+    query_artist = normalize_query(artist)
+    title_scores = [ratio(query_title, normalize_candidate(c[0])) for c in candidates]
+    artist_scores = [ratio(query_artist, normalize_candidate(c[1])) for c in candidates]
+    return pick_best(title, artist, candidates, title_scores, artist_scores)
+
+
+def find_best_matches(queries):
+    """여러 곡을 한 번에 매칭. queries: (제목, 아티스트, 후보 목록) 목록. 곡별 find_best_match 결과 목록을 반환.
+
+    rapidfuzz 가 있으면 모든 (곡, 후보) 쌍의 점수를 cpdist 한 번으로 계산한다.
+    """
+    if cpdist is None:
+        return [find_best_match(title, artist, candidates) for title, artist, candidates in queries]
+
+    query_titles, candidate_titles, query_artists, candidate_artists = [], [], [], []
+    for title, artist, candidates in queries:
+        normalized_title = normalize_query(title)
+        normalized_artist = normalize_query(artist)
+        for candidate in candidates:
+            query_titles.append(normalized_title)
+            candidate_titles.append(normalize_candidate(candidate[0]))
+            query_artists.append(normalized_artist)
+            candidate_artists.append(normalize_candidate(candidate[1]))
+
+    if not query_titles:
+        return [None] * len(queries)
+
+    title_scores = cpdist(query_titles, candidate_titles, scorer=fuzz.ratio, workers=-1)
+    artist_scores = cpdist(query_artists, candidate_artists, scorer=fuzz.ratio, workers=-1)
+
+    results = []
+    offset = 0
+    for title, artist, candidates in queries:
+        end = offset + len(candidates)
+        results.append(pick_best(title, artist, candidates, title_scores[offset:end], artist_scores[offset:end]))
+        offset = end
+    return results
@@ -0,0 +1,19 @@
+import os
+import sqlite3
+
+
+def open_state_db(path, shared=False):
+    """상태 저장용 sqlite 파일을 연다. 디렉터리가 없으면 만든다.
+
+    여러 스레드가 같은 연결을 쓰므로 check_same_thread 를 끄고, 사용하는 쪽이 lock 으로 접근을 직렬화한다.
+    shared 이면 샤드 실행 시 여러 프로세스가 같은 파일을 쓰므로 WAL 모드(읽기와 쓰기가 서로 막지 않음)와
+    잠금 대기 시간(30초)을 둔다.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if not shared:
+        return sqlite3.connect(path, check_same_thread=False)
+    db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    return db
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from state_db import open_state_db
+
+
+class SweepLog:
+    """보강이 끝나지 않은 곡을 다시 시도한 기록을 sqlite 파일에 저장.
+
+    - 실패한 곡은 base_backoff * 2^(시도 횟수 - 1) 초 동안 다시 시도하지 않는다
+    - max_attempts 번 실패한 곡은 더 이상 시도하지 않는다
+    - 성공한 곡은 기록을 지운다
+    """
+
+    def __init__(self, path, max_attempts=10, base_backoff=86400.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.lock = threading.Lock()
+        self.db = open_state_db(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS sweep_attempts (
+                stage TEXT NOT NULL,
+                song_number TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                next_attempt_at REAL NOT NULL,
+                PRIMARY KEY (stage, song_number)
+            )
+        """)
+        self.db.commit()
+
+    def due(self, stage, song_numbers):
+        """song_numbers 중 지금 시도할 수 있는 곡을 시도 횟수가 적은 순서로 반환 (같으면 주어진 순서)."""
+        song_numbers = [str(song_number) for song_number in song_numbers]
+        if not song_numbers:
+            return []
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT song_number, attempts, next_attempt_at FROM sweep_attempts "
+                "WHERE stage = ? AND song_number IN ({})".format(','.join(['?'] * len(song_numbers))),
+                [stage] + song_numbers,
+            ).fetchall()
+        now = time.time()
+        attempts = {song_number: (count, next_attempt_at) for song_number, count, next_attempt_at in rows}
+        due = [song_number for song_number in song_numbers
+               if song_number not in attempts
+               or (attempts[song_number][0] < self.max_attempts and attempts[song_number][1] <= now)]
+        return sorted(due, key=lambda song_number: attempts.get(song_number, (0,))[0])
+
+    def succeeded(self, stage, song_numbers):
+        with self.lock:
+            self.db.executemany(
+                "DELETE FROM sweep_attempts WHERE stage = ? AND song_number = ?",
+                [(stage, str(song_number)) for song_number in song_numbers],
+            )
+            self.db.commit()
+
+    def failed(self, stage, song_number, error):
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT attempts FROM sweep_attempts WHERE stage = ? AND song_number = ?", (stage, str(song_number))
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            self.db.execute(
+                "INSERT OR REPLACE INTO sweep_attempts (stage, song_number, attempts, last_error, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (stage, str(song_number), attempts, str(error), now + self.base_backoff * (2 ** (attempts - 1))),
+            )
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+
+from state_db import open_state_db
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class WorkQueue:
+    """단계별(stage) 곡 작업 상태를 sqlite 파일에 저장하는 작업 큐.
+
+    - 같은 (stage, song_number) 는 한 번만 등록되고, 완료된 작업은 다시 등록해도 무시된다
+    - 실패한 작업은 base_backoff * 2^(시도 횟수 - 1) 초 뒤에 다시 꺼내지고,
+      max_attempts 번 실패하면 failed 상태로 남는다
+    - 프로세스가 중간에 죽어 running 으로 남은 작업은 다음 실행 시 pending 으로 되돌린다
+    - complete / fail 은 아직 등록되지 않은 작업이면 새로 등록한다 (스트리밍 처리에서 앞 단계보다 먼저 끝난 경우)
+    """
+
+    def __init__(self, path, max_attempts=5, base_backoff=60.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.lock = threading.Lock()
+        self.db = open_state_db(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS work_items (
+                stage TEXT NOT NULL,
+                song_number TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                next_attempt_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (stage, song_number)
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS work_items_due ON work_items (stage, status, next_attempt_at)")
+        self.db.execute("UPDATE work_items SET status = ? WHERE status = ?", (PENDING, RUNNING))
+        self.db.commit()
+
+    def enqueue(self, stage, items):
+        """items: (song_number, payload) 목록. 이미 등록된 작업은 건드리지 않는다."""
+        now = time.time()
+        with self.lock:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO work_items (stage, song_number, payload, status, next_attempt_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(stage, str(song_number), json.dumps(payload, ensure_ascii=False), PENDING, now, now)
+                 for song_number, payload in items],
+            )
+            self.db.commit()
+
+    def claim(self, stage, limit=None):
+        """실행할 시각이 된 pending 작업을 running 으로 바꾸고 (song_number, payload) 목록으로 반환."""
+        now = time.time()
+        query = ("SELECT song_number, payload FROM work_items "
+                 "WHERE stage = ? AND status = ? AND next_attempt_at <= ? ORDER BY next_attempt_at")
+        params = [stage, PENDING, now]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.db.execute(query, params).fetchall()
+            self.db.executemany(
+                "UPDATE work_items SET status = ?, updated_at = ? WHERE stage = ? AND song_number = ?",
+                [(RUNNING, now, stage, song_number) for song_number, _ in rows],
+            )
+            self.db.commit()
+        return [(song_number, json.loads(payload)) for song_number, payload in rows]
+
+    def complete(self, stage, song_number, next_stage=None, payload=None):
+        """작업을 완료 처리하고, next_stage 가 있으면 다음 단계 작업을 등록."""
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO work_items (stage, song_number, payload, status, next_attempt_at, updated_at) "
+                "VALUES (?, ?, 'null', ?, ?, ?) "
+                "ON CONFLICT (stage, song_number) DO UPDATE SET status = excluded.status, last_error = NULL, "
+                "updated_at = excluded.updated_at",
+                (stage, str(song_number), DONE, now, now),
+            )
+            if next_stage is not None:
+                self.db.execute(
+                    "INSERT OR IGNORE INTO work_items (stage, song_number, payload, status, next_attempt_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (next_stage, str(song_number), json.dumps(payload, ensure_ascii=False), PENDING, now, now),
+                )
+            self.db.commit()
+
+    def fail(self, stage, song_number, error, payload=None):
+        """시도 횟수를 늘리고 백오프 후 재시도하도록 예약. 최대 횟수를 넘으면 failed 로 표시.
+        등록되지 않은 작업이면 payload 로 새로 등록한다."""
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT attempts FROM work_items WHERE stage = ? AND song_number = ?", (stage, str(song_number))
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            status = FAILED if attempts >= self.max_attempts else PENDING
+            next_attempt_at = now + self.base_backoff * (2 ** (attempts - 1))
+            if row is None:
+                self.db.execute(
+                    "INSERT INTO work_items (stage, song_number, payload, status, attempts, last_error, next_attempt_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (stage, str(song_number), json.dumps(payload, ensure_ascii=False), status, attempts, str(error),
+                     next_attempt_at, now),
+                )
+            else:
+                self.db.execute(
+                    "UPDATE work_items SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, updated_at = ? "
+                    "WHERE stage = ? AND song_number = ?",
+                    (status, attempts, str(error), next_attempt_at, now, stage, str(song_number)),
+                )
+            self.db.commit()
+
+    def counts(self):
+        """{stage: {status: 개수}} 형태의 현황."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT stage, status, COUNT(*) FROM work_items GROUP BY stage, status"
+            ).fetchall()
+        result = {}
+        for stage, status, count in rows:
+            result.setdefault(stage, {})[status] = count
+        return result
+
+    def close(self):
+        with self.lock:
+            self.db.close()